@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Response
 from domain.models import LoginRequest, LoginResponse, GenericResponse, LogoutRequest
 from services.auth_service import login, logout
 from fastapi.responses import JSONResponse
+from infrastructure.aio import run_io
 
 router = APIRouter()
 
@@ -9,7 +10,7 @@ router = APIRouter()
 @router.post("/login", response_model=LoginResponse)
 async def login_user(request: LoginRequest, response: Response):
     try:
-        cookies = login(request)
+        cookies = await run_io(login, request)
         response.set_cookie(
             key="access_token",
             value=cookies.access_token,
@@ -47,7 +48,7 @@ async def logout_user(
         response.delete_cookie(key="access_token")
         response.delete_cookie(key="refresh_token")
         response.delete_cookie(key="id_token")
-        return logout(request=request)
+        return await run_io(logout, request=request)
 
     except HTTPException as he:
         raise he
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import RedirectResponse, StreamingResponse
+from services.job_service import get_job, get_job_bundle_key, submit_job
+from domain.models import VoucherJobRequest, VoucherJobResponse
+from infrastructure.cognito import verify_token
+from infrastructure.aio import run_io
+from infrastructure.s3 import open_job_object, presign_download
+from utils.streaming import STREAM_CHUNK_SIZE
+from botocore.exceptions import ClientError, BotoCoreError
+
+router = APIRouter()
+
+
+@router.post("", response_model=VoucherJobResponse, status_code=202)
+async def submit_voucher_job(
+    job_request: VoucherJobRequest, token: str = Depends(verify_token)
+):
+    try:
+        return await run_io(submit_job, job_request.vouchers, job_request.send_emails)
+
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"AWS error: {ce.response['Error']['Message']}"
+        )
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.get("/{job_id}", response_model=VoucherJobResponse)
+async def get_voucher_job(job_id: str, token: str = Depends(verify_token)):
+    try:
+        return await run_io(get_job, job_id)
+
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"DynamoDB error: {ce.response['Error']['Message']}"
+        )
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.get("/{job_id}/bundle")
+async def download_voucher_job_bundle(
+    job_id: str, redirect: bool = False, token: str = Depends(verify_token)
+):
+    try:
+        bundle_key = await run_io(get_job_bundle_key, job_id)
+
+        if redirect:
+            url = await run_io(presign_download, bundle_key, "Atletika_Vouchers.zip")
+            return RedirectResponse(url=url, status_code=307)
+
+        body = await run_io(open_job_object, bundle_key)
+        return StreamingResponse(
+            content=body.iter_chunks(STREAM_CHUNK_SIZE),
+            media_type="application/zip",
+            headers={
+                "Content-Disposition": "attachment; filename=Atletika_Vouchers.zip"
+            },
+        )
+
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"AWS error: {ce.response['Error']['Message']}"
+        )
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from core.executors import pending_renders
+from infrastructure.aws import connection_pool_stats
+from infrastructure.cognito import verify_token
+from core.metrics import metrics
+from core.render_cache import render_cache
+from core.token_cache import token_cache
+from core.voucher_cache import voucher_cache
+from services.email_delivery import email_queue
+
+router = APIRouter()
+
+
+def _token_cache_metrics():
+    stats = token_cache.stats()
+    yield "token_cache_hits_total", "counter", stats["hits"], ()
+    yield "token_cache_misses_total", "counter", stats["misses"], ()
+    yield "token_cache_evictions_total", "counter", stats["evictions"], ()
+    yield "token_cache_size", "gauge", stats["size"], ()
+    yield "token_cache_hit_ratio", "gauge", stats["hit_ratio"], ()
+
+
+def _voucher_cache_metrics():
+    stats = voucher_cache.stats()
+    labels = (("backend", stats["backend"]),)
+    yield "voucher_cache_hits_total", "counter", stats["hits"], labels
+    yield "voucher_cache_misses_total", "counter", stats["misses"], labels
+    yield "voucher_cache_evictions_total", "counter", stats["evictions"], labels
+    yield "voucher_cache_errors_total", "counter", stats["errors"], labels
+    yield "voucher_cache_hit_ratio", "gauge", stats["hit_ratio"], labels
+
+
+def _render_cache_metrics():
+    stats = render_cache.stats()
+    tiers = {
+        "memory": ("memory_hits", "evictions"),
+        "disk": ("disk_hits", "disk_evictions"),
+    }
+    for tier, (hits, evictions) in tiers.items():
+        labels = (("tier", tier),)
+        yield "render_cache_hits_total", "counter", stats[hits], labels
+        yield "render_cache_evictions_total", "counter", stats[evictions], labels
+    yield "render_cache_misses_total", "counter", stats["misses"], ()
+    yield "render_cache_errors_total", "counter", stats["errors"], ()
+    yield "render_cache_bytes", "gauge", stats["bytes"], ()
+    yield "render_cache_hit_ratio", "gauge", stats["hit_ratio"], ()
+
+
+def _render_pool_metrics():
+    yield "render_pending", "gauge", pending_renders(), ()
+
+
+def _aws_pool_metrics():
+    for service, stats in connection_pool_stats().items():
+        labels = (("service", service),)
+        yield "aws_pool_connections_in_use", "gauge", stats["in_use"], labels
+        yield "aws_pool_max_connections", "gauge", stats["max"], labels
+        yield "aws_pool_saturation", "gauge", stats["saturation"], labels
+        yield "aws_pool_connections_opened_total", "counter", stats["opened"], labels
+
+
+def _email_queue_metrics():
+    yield "email_queue_pending", "gauge", email_queue.pending(), ()
+
+
+metrics.register_collector(_token_cache_metrics)
+metrics.register_collector(_voucher_cache_metrics)
+metrics.register_collector(_render_cache_metrics)
+metrics.register_collector(_render_pool_metrics)
+metrics.register_collector(_aws_pool_metrics)
+metrics.register_collector(_email_queue_metrics)
+
+
+# Route labels, cache sizes and error counts are not for the public, so
+# scrapers authenticate like any other API client.
+@router.get("", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(token: str = Depends(verify_token)):
+    return PlainTextResponse(
+        content=metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,41 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    UploadFile,
+)
 from services.voucher_service import (
     create_voucher,
+    create_vouchers_batch,
     claim_voucher,
-    get_all_vouchers,
+    claim_vouchers_batch,
+    list_vouchers,
+    scan_all_vouchers,
     get_voucher,
+    get_voucher_pdf_key,
 )
 from domain.models import (
     VoucherDetails,
+    VoucherBatchRequest,
+    VoucherImportResponse,
     ClaimVoucherRequest,
+    ClaimVoucherBatchRequest,
+    ClaimVoucherBatchResponse,
     GenericResponse,
     VoucherList,
     VoucherResponse,
 )
+from services.import_service import import_vouchers
 from infrastructure.cognito import verify_token
+from infrastructure.aio import run_io
+from infrastructure.s3 import open_voucher_pdf, presign_download
+from constants.enums import (
+    VOUCHER_MEDIA_TYPES,
+    BatchOutputFormat,
+    BatchItemStatus,
+    ExportFormat,
+    VoucherFormat,
+    VoucherStatus,
+)
+from utils.export import EXPORT_FIELDS, to_csv, to_ndjson
+from utils.streaming import STREAM_CHUNK_SIZE, iter_buffer
+from core.config import config
 from botocore.exceptions import ClientError, BotoCoreError
-from fastapi.responses import StreamingResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 
 
 router = APIRouter()
 
+_FORMATS_BY_MEDIA_TYPE = {
+    media_type: voucher_format
+    for voucher_format, media_type in VOUCHER_MEDIA_TYPES.items()
+}
+
+
+def _negotiate_format(accept: Optional[str]) -> VoucherFormat:
+    """
+    Picks the voucher format from an Accept header, by quality and then by
+    order. Anything that names no supported type gets the PDF, as before.
+    """
+    ranges = []
+    for index, media_range in enumerate((accept or "").split(",")):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranges.append((-quality, index, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in _FORMATS_BY_MEDIA_TYPE:
+            return _FORMATS_BY_MEDIA_TYPE[media_type]
+        if media_type == "image/*":
+            return VoucherFormat.PNG
+        if media_type in ("*/*", "application/*"):
+            return VoucherFormat.PDF
+    return VoucherFormat.PDF
+
 
 @router.post("/generate", response_model=VoucherDetails)
 async def generate_voucher(
-    voucher_details: VoucherDetails, token: str = Depends(verify_token)
+    voucher_details: VoucherDetails,
+    format: Optional[VoucherFormat] = None,
+    accept: Optional[str] = Header(None),
+    token: str = Depends(verify_token),
 ):
     try:
-        voucher = create_voucher(
+        # An explicit format parameter wins over the Accept header.
+        voucher_format = format or _negotiate_format(accept)
+        voucher = await run_io(
+            create_voucher,
             voucher_details.first_name,
             voucher_details.last_name,
             voucher_details.expiry_date,
             voucher_details.percentage,
+            voucher_format,
         )
         return StreamingResponse(
-            content=voucher,
-            media_type="application/pdf",
+            content=iter_buffer(voucher),
+            media_type=VOUCHER_MEDIA_TYPES[voucher_format],
             headers={
-                "Content-Disposition": "attachment; filename=Atletika_Voucher.pdf"
+                "Content-Disposition": "attachment; "
+                f"filename=Atletika_Voucher.{voucher_format.value}",
+                "Vary": "Accept",
             },
         )
 
@@ -53,12 +128,82 @@ async def generate_voucher(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post("/generate/batch")
+async def generate_voucher_batch(
+    batch_request: VoucherBatchRequest,
+    output_format: BatchOutputFormat = BatchOutputFormat.ZIP,
+    token: str = Depends(verify_token),
+):
+    try:
+        bundle, results = await run_io(
+            create_vouchers_batch, batch_request.vouchers, output_format
+        )
+        failed = sum(
+            1 for result in results if result.status == BatchItemStatus.FAILED.value
+        )
+
+        if output_format == BatchOutputFormat.PDF:
+            media_type = "application/pdf"
+            filename = "Atletika_Vouchers.pdf"
+        else:
+            media_type = "application/zip"
+            filename = "Atletika_Vouchers.zip"
+
+        return StreamingResponse(
+            content=iter_buffer(bundle),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "X-Vouchers-Succeeded": str(len(results) - failed),
+                "X-Vouchers-Failed": str(failed),
+            },
+        )
+
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"DynamoDB error: {ce.response['Error']['Message']}"
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.post("/import", response_model=VoucherImportResponse)
+async def import_vouchers_csv(
+    file: UploadFile = File(...),
+    send_emails: bool = False,
+    token: str = Depends(verify_token),
+):
+    try:
+        return await run_io(import_vouchers, file.file, send_emails)
+
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"DynamoDB error: {ce.response['Error']['Message']}"
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    finally:
+        await file.close()
+
+
 @router.post("/claim", response_model=GenericResponse)
 async def claim_voucher_endpoint(
     claim_request: ClaimVoucherRequest, token: str = Depends(verify_token)
 ):
     try:
-        claim_voucher(claim_request.voucher_id)
+        await run_io(claim_voucher, claim_request.voucher_id)
         return GenericResponse(message="Voucher successfully claimed.")
 
     except ValueError as ve:
@@ -75,23 +220,52 @@ async def claim_voucher_endpoint(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post("/claim/batch", response_model=ClaimVoucherBatchResponse)
+async def claim_voucher_batch_endpoint(
+    claim_request: ClaimVoucherBatchRequest, token: str = Depends(verify_token)
+):
+    try:
+        results = await run_io(claim_vouchers_batch, claim_request.voucher_ids)
+        return ClaimVoucherBatchResponse(results=results)
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
 @router.get("/all", response_model=VoucherList)
-async def get_vouchers(token: str = Depends(verify_token)):
+async def get_vouchers(
+    limit: int = Query(config.VOUCHER_PAGE_SIZE, ge=1, le=config.VOUCHER_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[VoucherStatus] = None,
+    expires_after: Optional[str] = None,
+    expires_before: Optional[str] = None,
+    token: str = Depends(verify_token),
+):
     try:
-        vouchers = get_all_vouchers()
-        return VoucherList(
-            vouchers=[
-                {
-                    "voucher_id": voucher["voucher-id"],
-                    "first_name": voucher["first-name"],
-                    "last_name": voucher["last-name"],
-                    "percentage": voucher["percentage"],
-                    "status": voucher["status"],
-                }
-                for voucher in vouchers
-            ]
+        for bound in (expires_after, expires_before):
+            if bound is not None:
+                datetime.fromisoformat(bound)
+
+        vouchers, next_cursor = await run_io(
+            list_vouchers,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            expires_after=expires_after,
+            expires_before=expires_before,
+        )
+        # The page is validated straight from the Voucher entities and
+        # serialized once; returning the model would have FastAPI dump,
+        # revalidate and re-encode every row.
+        page = VoucherList.model_validate(
+            {"vouchers": vouchers, "next_cursor": next_cursor}, from_attributes=True
         )
+        return Response(content=page.model_dump_json(), media_type="application/json")
 
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except ClientError as ce:
         raise HTTPException(
             status_code=500, detail=f"DynamoDB error: {ce.response['Error']['Message']}"
@@ -104,10 +278,32 @@ async def get_vouchers(token: str = Depends(verify_token)):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.get("/export")
+async def export_vouchers(
+    format: ExportFormat = ExportFormat.NDJSON,
+    segments: int = Query(1, ge=1, le=config.EXPORT_MAX_SEGMENTS),
+    token: str = Depends(verify_token),
+):
+    items = scan_all_vouchers(segments, EXPORT_FIELDS)
+
+    if format == ExportFormat.CSV:
+        content, media_type = to_csv(items), "text/csv"
+    else:
+        content, media_type = to_ndjson(items), "application/x-ndjson"
+
+    return StreamingResponse(
+        content=content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=vouchers.{format.value}"
+        },
+    )
+
+
 @router.get("/{voucher_id}", response_model=VoucherResponse)
 async def get_single_voucher(voucher_id: str, token: str = Depends(verify_token)):
     try:
-        voucher = get_voucher(voucher_id)
+        voucher = await run_io(get_voucher, voucher_id)
         return voucher
     except ValueError as ve:
         raise HTTPException(status_code=404, detail=str(ve))
@@ -119,3 +315,42 @@ async def get_single_voucher(voucher_id: str, token: str = Depends(verify_token)
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+@router.get("/{voucher_id}/pdf")
+async def download_voucher_pdf(
+    voucher_id: str, redirect: bool = False, token: str = Depends(verify_token)
+):
+    try:
+        pdf_key = await run_io(get_voucher_pdf_key, voucher_id)
+
+        if redirect:
+            url = await run_io(presign_download, pdf_key)
+            return RedirectResponse(url=url, status_code=307)
+
+        try:
+            body = await run_io(open_voucher_pdf, pdf_key)
+        except FileNotFoundError:
+            pdf_key = await run_io(get_voucher_pdf_key, voucher_id, True)
+            body = await run_io(open_voucher_pdf, pdf_key)
+
+        return StreamingResponse(
+            content=body.iter_chunks(STREAM_CHUNK_SIZE),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": "attachment; filename=Atletika_Voucher.pdf"
+            },
+        )
+
+    except ValueError as ve:
+        raise HTTPException(status_code=404, detail=str(ve))
+    except ClientError as ce:
+        raise HTTPException(
+            status_code=500, detail=f"AWS error: {ce.response['Error']['Message']}"
+        )
+    except BotoCoreError as be:
+        raise HTTPException(status_code=503, detail=f"AWS service error: {str(be)}")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
@@ -0,0 +1,131 @@
+"""
+Load-tests the shared AWS clients against a local DynamoDB/S3 stand-in.
+
+Every worker thread repeats one DynamoDB GetItem and one S3 GetObject (the
+voucher template) for --seconds, at each concurrency level. The same load
+runs once with boto3's default client settings (pool of 10, legacy retries)
+and once with the clients from infrastructure.aws, and the throughput,
+latency and connection churn are printed side by side. "opened" counts the
+connections each client opened; once the pool is saturated it grows with the
+traffic, since every call past the pool size opens and closes its own.
+
+A moto server has no TLS and answers from the same machine, so this shows
+the pool limits and client-side contention rather than the handshake cost,
+which makes churn far more expensive against real endpoints. moto[server]
+is required and is not part of requirements.txt.
+
+Usage (from the backend directory):
+    python -m benchmarks.aws_pool [--concurrency 1 4 16 32 64] [--seconds 3]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from benchmarks.stand_in import create_table, create_template_bucket, use_stand_in
+
+KEY = {"voucher-id": {"S": "pool-benchmark"}}
+
+
+def default_clients() -> tuple:
+    import boto3
+
+    session = boto3.session.Session(region_name="us-east-1")
+    return session.client("dynamodb"), session.client("s3")
+
+
+def shared_clients() -> tuple:
+    from infrastructure.aws import create_client
+
+    return create_client("dynamodb"), create_client("s3")
+
+
+def run_level(clients: tuple, concurrency: int, seconds: float) -> dict:
+    from core.config import config
+    from infrastructure.aws import pool_stats
+
+    dynamodb, s3 = clients
+    template_key = f"templates/{config.VOUCHER_TEMPLATE}"
+    opened_before = sum(pool_stats(client)["opened"] for client in clients)
+    timings, errors = [], 0
+    lock = threading.Lock()
+    stopping = threading.Event()
+    saturation = 0.0
+
+    def worker():
+        nonlocal errors
+        local_timings, local_errors = [], 0
+        while not stopping.is_set():
+            start = time.perf_counter()
+            try:
+                dynamodb.get_item(TableName=config.DYNAMODB_TABLE, Key=KEY)
+                s3.get_object(Bucket=config.S3_BUCKET, Key=template_key)["Body"].read()
+            except Exception:
+                local_errors += 1
+                continue
+            local_timings.append((time.perf_counter() - start) * 1000)
+        with lock:
+            timings.extend(local_timings)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while time.perf_counter() - started < seconds:
+        time.sleep(0.05)
+        saturation = max(
+            saturation, *(pool_stats(client)["saturation"] for client in clients)
+        )
+    stopping.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "ops_per_second": len(timings) / elapsed,
+        "p50_ms": statistics.median(timings) if timings else 0.0,
+        "p95_ms": timings[max(int(len(timings) * 0.95) - 1, 0)] if timings else 0.0,
+        "opened": sum(pool_stats(client)["opened"] for client in clients)
+        - opened_before,
+        "saturation": saturation,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16, 32, 64]
+    )
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    use_stand_in()
+    create_table()
+    create_template_bucket()
+
+    from core.config import config
+
+    modes = {
+        "default": default_clients(),
+        f"shared (pool {config.AWS_MAX_POOL_CONNECTIONS})": shared_clients(),
+    }
+    print(
+        f"{'clients':<20}{'threads':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'opened':>8}{'saturation':>12}{'errors':>8}"
+    )
+    for name, clients in modes.items():
+        for concurrency in args.concurrency:
+            result = run_level(clients, concurrency, args.seconds)
+            print(
+                f"{name:<20}{concurrency:>8}{result['ops_per_second']:>9.0f}"
+                f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                f"{result['opened']:>8}{result['saturation']:>12.2f}"
+                f"{result['errors']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Races concurrent claims of the same voucher and checks that exactly one wins.
+
+By default the claims run against a single-threaded moto server, which applies
+writes one at a time like DynamoDB does per item. Set AWS_ENDPOINT_URL_DYNAMODB
+to point at DynamoDB Local instead. moto[server] is required for the default
+mode and is not part of requirements.txt.
+
+Usage (from the backend directory):
+    python -m benchmarks.claim_race [--claimers 32] [--rounds 20]
+"""
+
+import argparse
+import threading
+import uuid
+from collections import Counter
+from benchmarks.stand_in import create_table, use_stand_in
+
+
+def race(claimers: int) -> Counter:
+    from fastapi import HTTPException
+    from infrastructure.dynamodb import table
+    from services.voucher_service import claim_voucher
+
+    voucher_id = str(uuid.uuid4())
+    table.put_item(
+        Item={
+            "voucher-id": voucher_id,
+            "first-name": "Race",
+            "last-name": "Test",
+            "expiry-date": "2999-12-31T23:59:59",
+            "percentage": "10",
+            "status": "unused",
+        }
+    )
+
+    outcomes = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(claimers)
+
+    def claim():
+        barrier.wait()
+        try:
+            claim_voucher(voucher_id)
+            outcome = "claimed"
+        except HTTPException as he:
+            outcome = he.detail
+        with lock:
+            outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=claim) for _ in range(claimers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--claimers", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    use_stand_in(("DYNAMODB",), threaded=False)
+    create_table()
+    for round_number in range(args.rounds):
+        outcomes = race(args.claimers)
+        print(f"round {round_number + 1}: {dict(outcomes)}")
+        assert outcomes["claimed"] == 1, "expected exactly one winner"
+
+    print("OK: every round had exactly one winner.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Measures cold-start cost per route, as a fresh Lambda container would pay it.
+
+Each route is invoked in a new interpreter: the script records how long
+`import main` takes, how long the first request to the route takes, and
+whether the PDF stack (PIL, qrcode, ReportLab) was loaded along the way. AWS
+calls go to a local moto server (see benchmarks/stand_in.py) and token
+verification is bypassed. With --importtime, the slowest modules of
+`python -X importtime -c "import main"` are listed as well.
+
+Usage (from the backend directory):
+    python -m benchmarks.cold_start [--importtime] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from benchmarks.stand_in import create_table, create_template_bucket, use_stand_in
+
+PDF_STACK = ("PIL", "qrcode", "reportlab")
+
+ROUTES = [
+    ("POST", "/auth/login", {"email": "cold@start.test", "password": "x"}),
+    ("POST", "/vouchers/claim", {"voucher_id": "cold-start-voucher"}),
+    ("GET", "/vouchers/all", None),
+    (
+        "POST",
+        "/vouchers/generate",
+        {
+            "first_name": "Cold",
+            "last_name": "Start",
+            "expiry_date": "2999-12-31T23:59:59",
+            "percentage": "10",
+        },
+    ),
+]
+
+INVOKE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+from infrastructure.cognito import verify_token
+from services import voucher_service
+main.app.dependency_overrides[verify_token] = lambda: {"sub": "cold-start"}
+voucher_service.deliver_voucher_email = lambda email, pdf_data, *args: None
+client = TestClient(main.app)
+request_start = time.perf_counter()
+response = client.request(sys.argv[1], sys.argv[2], json=json.loads(sys.argv[3]))
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (done - request_start) * 1000,
+    "status": response.status_code,
+    "pdf_stack": any(name in sys.modules for name in %r),
+    "modules": len(sys.modules),
+}))
+""" % (PDF_STACK,)
+
+
+def reset_claim_voucher():
+    from infrastructure.dynamodb import get_table
+
+    get_table().put_item(
+        Item={
+            "voucher-id": "cold-start-voucher",
+            "first-name": "Cold",
+            "last-name": "Start",
+            "expiry-date": "2999-12-31T23:59:59",
+            "percentage": "10",
+            "status": "unused",
+        }
+    )
+
+
+def invoke(method: str, path: str, body) -> dict:
+    env = dict(os.environ, PRELOAD_TEMPLATES="", EMAIL_ASYNC_DELIVERY="false")
+    result = subprocess.run(
+        [sys.executable, "-c", INVOKE, method, path, json.dumps(body)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line.split("|")
+        rows.append((int(cumulative_us), int(self_us.split(":")[1]), module.strip()))
+
+    print(f"\nslowest imports of main ({'cumulative ms':>13}, self ms)")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {module:<40}{cumulative_us / 1000:>13.1f}{self_us / 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    use_stand_in(("DYNAMODB", "S3", "COGNITO_IDP"))
+    create_table()
+    create_template_bucket()
+
+    print(
+        f"{'route':<26}{'import ms':>10}{'1st req ms':>12}{'status':>8}"
+        f"{'modules':>9}  pdf stack"
+    )
+    for method, path, body in ROUTES:
+        reset_claim_voucher()
+        result = invoke(method, path, body)
+        print(
+            f"{method + ' ' + path:<26}{result['import_ms']:>10.1f}"
+            f"{result['first_request_ms']:>12.1f}{result['status']:>8}"
+            f"{result['modules']:>9}  {'yes' if result['pdf_stack'] else 'no'}"
+        )
+
+    if args.importtime:
+        import_profile(args.top)
+
+
+if __name__ == "__main__":
+    main()
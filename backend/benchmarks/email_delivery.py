@@ -0,0 +1,108 @@
+"""
+Checks the email delivery queue against a local aiosmtpd server.
+
+Queues --messages voucher emails with one delivery worker and a pool of one
+SMTP connection, and asserts that every message arrives and that they all
+share a single SMTP session. It then points the queue at a closed port and
+asserts that stopping it gives up after the drain timeout instead of waiting
+out the retries. aiosmtpd is required and is not part of requirements.txt.
+
+Usage (from the backend directory):
+    python -m benchmarks.email_delivery [--messages 25]
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+
+os.environ.update(
+    SMTP_HOST="127.0.0.1",
+    SMTP_USE_TLS="false",
+    SMTP_POOL_SIZE="1",
+    EMAIL_WORKERS="1",
+    EMAIL_ADDRESS="vouchers@example.com",
+    EMAIL_APP_PASSWORD="",
+    EMAIL_RETRY_BACKOFF="1",
+)
+
+
+class RecordingHandler:
+    """Records the SMTP session every message arrived on."""
+
+    def __init__(self):
+        self.sessions: list[int] = []
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.sessions.append(id(session))
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def check_delivery(messages: int):
+    from aiosmtpd.controller import Controller
+    from core.config import config
+    from services.email_delivery import EmailDeliveryQueue, EmailJob
+
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    config.SMTP_PORT = controller.port
+    try:
+        delivery = EmailDeliveryQueue()
+        for index in range(messages):
+            delivery.enqueue(
+                EmailJob(email=f"recipient{index}@example.com", pdf_data=b"%PDF-1.3")
+            )
+        delivery.stop(timeout=30)
+    finally:
+        controller.stop()
+
+    sessions = len(set(handler.sessions))
+    print(f"delivered {len(handler.sessions)}/{messages} over {sessions} session(s)")
+    assert len(handler.sessions) == messages, "expected every message delivered"
+    assert sessions == 1, "expected a single SMTP session"
+
+
+def check_bounded_shutdown(timeout: float = 1):
+    from core.config import config
+    from infrastructure.smtp import smtp_pool
+    from services.email_delivery import EmailDeliveryQueue, EmailJob
+
+    smtp_pool.close()
+    config.SMTP_PORT = _free_port()  # Nothing listens here.
+
+    delivery = EmailDeliveryQueue()
+    for index in range(10):
+        delivery.enqueue(
+            EmailJob(email=f"recipient{index}@example.com", pdf_data=b"%PDF-1.3")
+        )
+    start = time.perf_counter()
+    delivery.stop(timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    print(f"stopped {elapsed:.2f} s after shutdown began, timeout {timeout} s")
+    assert elapsed < timeout + 1, "expected shutdown bounded by the timeout"
+    assert delivery.pending() == 0, "expected the remaining emails dropped"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=25)
+    args = parser.parse_args()
+
+    check_delivery(args.messages)
+    check_bounded_shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Checks how expiry dates are stored: their canonical form and their TTL.
+
+Every accepted spelling of an expiry date must be stored in the one form
+whose string order is its time order, since DynamoDB compares them as
+strings. A voucher that "never expires", e.g. "9999-12-31T23:59:59", must
+still turn into an item, without a TTL since its deletion date would fall
+past the end of the calendar. Nothing here talks to AWS.
+
+Usage (from the backend directory):
+    python -m benchmarks.expiry_dates
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+
+
+def check_canonical_form():
+    from domain.entities import canonical_datetime
+
+    moment = datetime(2026, 10, 18, 3, 47, 38)
+    offset = moment.astimezone().astimezone(timezone(timedelta(hours=5)))
+    for value in (
+        "2026-10-18T03:47:38",
+        "2026-10-18 03:47:38",
+        "2026-10-18T03:47:38.123456",
+        offset.isoformat(),
+    ):
+        assert canonical_datetime(value) == "2026-10-18T03:47:38", value
+    assert canonical_datetime("2026-10-18") == "2026-10-18T00:00:00"
+
+    values = ["2026-10-18T05:00:00", "2026-10-18 23:00:00", "2026-10-19"]
+    canonical = [canonical_datetime(value) for value in values]
+    assert sorted(canonical) == canonical, "expected string order to be time order"
+    print("canonical form: OK")
+
+
+def check_ttl():
+    from core.config import config
+    from domain.entities import Voucher
+
+    item = Voucher("v", "a", "b", "2030-01-01T00:00:00", "10").to_item()
+    expected = datetime(2030, 1, 1) + timedelta(days=config.VOUCHER_TTL_DAYS)
+    assert item[config.VOUCHER_TTL_ATTRIBUTE] == int(expected.timestamp())
+
+    for never in ("9999-12-31T23:59:59", "9999-12-31"):
+        item = Voucher("v", "a", "b", never, "10").to_item()
+        assert config.VOUCHER_TTL_ATTRIBUTE not in item, never
+        assert item["expiry-date"] == never
+    print("ttl: OK")
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__.strip().splitlines()[0]).parse_args()
+    check_canonical_form()
+    check_ttl()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
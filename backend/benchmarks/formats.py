@@ -0,0 +1,80 @@
+"""
+Compares the voucher output formats of utils.qr_generator: latency and
+payload size of the PDF renderer against the PNG, JPEG and WebP renderers.
+
+The S3 template fetch is replaced by a local stub and the template cache is
+warm, as on a long-lived worker. The placeholder template is a flat colour,
+which flatters the lossless formats; pass the production template with
+--template for representative payload sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.formats [--iterations 50] [--template PATH]
+        [--output PATH]
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from unittest import mock
+from constants.enums import VoucherFormat
+from utils import qr_generator, template_cache
+from benchmarks.rendering import EXPIRY_DATE, LocalTemplate, load_template, metadata
+
+
+def run_format(voucher_format: VoucherFormat, iterations: int) -> dict:
+    renderer = qr_generator.RENDERERS[voucher_format]
+    renderer.render(str(uuid.uuid4()), EXPIRY_DATE)  # warm up caches
+
+    timings, sizes = [], []
+    for _ in range(iterations):
+        voucher_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        sizes.append(len(renderer.render(voucher_id, EXPIRY_DATE)))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "format": voucher_format.value,
+        "media_type": renderer.media_type,
+        "iterations": iterations,
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[max(int(len(timings) * 0.95) - 1, 0)],
+        "output_bytes": statistics.median(sizes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--template", help="PNG to use instead of a placeholder")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    local = LocalTemplate(load_template(args.template))
+    results = []
+    with mock.patch.object(template_cache, "retrieve_template_if_modified", local):
+        template_cache.clear_templates()
+        print(
+            f"{'format':<8}{'median ms':>11}{'p95 ms':>9}{'bytes':>10}"
+            f"{'time vs pdf':>14}{'size vs pdf':>14}"
+        )
+        for voucher_format in VoucherFormat:
+            result = run_format(voucher_format, args.iterations)
+            results.append(result)
+            pdf = results[0]
+            print(
+                f"{result['format']:<8}{result['median_ms']:>11.2f}"
+                f"{result['p95_ms']:>9.2f}{result['output_bytes']:>10.0f}"
+                f"{result['median_ms'] / pdf['median_ms']:>13.2f}x"
+                f"{result['output_bytes'] / pdf['output_bytes']:>13.2f}x"
+            )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"metadata": metadata(), "formats": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Checks that a warm Lambda container keeps serving API requests.
+
+Invokes main.handler --invocations times with the same API Gateway event, as
+consecutive requests to one container would, and asserts that every
+invocation succeeds. The route runs its DynamoDB read on the shared I/O
+executor, which must outlive each invocation. AWS calls go to a local moto
+server (see benchmarks/stand_in.py) and token verification is bypassed.
+
+Usage (from the backend directory):
+    python -m benchmarks.lambda_handler [--invocations 3]
+"""
+
+import argparse
+import json
+import os
+from benchmarks.stand_in import create_table, use_stand_in
+
+os.environ.setdefault("AWS_LAMBDA_FUNCTION_NAME", "vouchers-benchmark")
+
+
+def api_gateway_event(method: str, path: str) -> dict:
+    return {
+        "resource": path,
+        "path": path,
+        "httpMethod": method,
+        "headers": {"host": "localhost"},
+        "multiValueHeaders": {"host": ["localhost"]},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "requestContext": {
+            "resourcePath": path,
+            "httpMethod": method,
+            "path": path,
+            "stage": "benchmark",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--invocations", type=int, default=3)
+    args = parser.parse_args()
+
+    use_stand_in()
+    create_table()
+
+    import main as lambda_main
+    from infrastructure.cognito import verify_token
+
+    lambda_main.app.dependency_overrides[verify_token] = lambda: {"sub": "benchmark"}
+    event = api_gateway_event("GET", "/vouchers/all")
+
+    statuses = []
+    for _ in range(args.invocations):
+        response = lambda_main.handler(event, None)
+        statuses.append(response["statusCode"])
+        assert "vouchers" in json.loads(response["body"]), response["body"]
+
+    print(f"statuses: {statuses}")
+    assert statuses == [200] * args.invocations, "expected every invocation to succeed"
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
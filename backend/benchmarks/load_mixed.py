@@ -0,0 +1,145 @@
+"""
+Load test for mixed claim/generate traffic against the ASGI app.
+
+Requests are sent in-process through httpx's ASGI transport, so the client and
+the app share one event loop. Any handler that blocks the loop shows up both in
+the tail latency of the other requests and in the measured loop lag. DynamoDB
+and S3 are served by a local moto server (see benchmarks/stand_in.py), token
+verification is bypassed and emails are not sent.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_mixed [--concurrency 32] [--requests 400] [--generate-ratio 0.2]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from benchmarks.stand_in import create_table, create_template_bucket, use_stand_in
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def seed_vouchers(count: int) -> list[str]:
+    from infrastructure.dynamodb import table
+
+    voucher_ids = [str(uuid.uuid4()) for _ in range(count)]
+    with table.batch_writer() as batch:
+        for voucher_id in voucher_ids:
+            batch.put_item(
+                Item={
+                    "voucher-id": voucher_id,
+                    "first-name": "Load",
+                    "last-name": "Test",
+                    "expiry-date": "2999-12-31T23:59:59",
+                    "percentage": "10",
+                    "status": "unused",
+                }
+            )
+    return voucher_ids
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: list[float]):
+    interval = 0.01
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def run(concurrency: int, total: int, generate_ratio: float):
+    import httpx
+    import main
+    from infrastructure.cognito import verify_token
+    from services import voucher_service
+
+    main.app.dependency_overrides[verify_token] = lambda: {"sub": "load-test"}
+    voucher_service.deliver_voucher_email = lambda email, pdf_data, *args: None
+
+    operations = [
+        "generate" if random.random() < generate_ratio else "claim"
+        for _ in range(total)
+    ]
+    claim_ids = seed_vouchers(operations.count("claim"))
+    latencies = {"generate": [], "claim": []}
+    errors = 0
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        # Warm up the render pool and template cache outside the measurement.
+        await client.post("/vouchers/generate", json=voucher_details())
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for operation in operations:
+            queue.put_nowait(operation)
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                operation = queue.get_nowait()
+                start = time.perf_counter()
+                if operation == "generate":
+                    response = await client.post(
+                        "/vouchers/generate", json=voucher_details()
+                    )
+                else:
+                    response = await client.post(
+                        "/vouchers/claim", json={"voucher_id": claim_ids.pop()}
+                    )
+                latencies[operation].append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        stop, lags = asyncio.Event(), []
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await lag_task
+
+    print(
+        f"{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s), {errors} errors"
+    )
+    print(f"{'operation':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for operation, values in latencies.items():
+        if values:
+            print(
+                f"{operation:<10}{len(values):>7}{statistics.median(values):>10.1f}"
+                f"{percentile(values, 0.95):>10.1f}{percentile(values, 0.99):>10.1f}"
+            )
+    if lags:
+        print(
+            f"event loop lag: p99 {percentile(lags, 0.99):.1f} ms, max {max(lags):.1f} ms"
+        )
+
+
+def voucher_details() -> dict:
+    return {
+        "first_name": "Load",
+        "last_name": "Test",
+        "expiry_date": "2999-12-31T23:59:59",
+        "percentage": "10",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--generate-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    use_stand_in()
+    create_table()
+    create_template_bucket()
+    asyncio.run(run(args.concurrency, args.requests, args.generate_ratio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Measures the memory used per voucher render, for every output format.
+
+Each scenario runs in a fresh interpreter, with the template cache warm:
+    - traced peak: the tracemalloc peak of a single render, i.e. the Python
+      heap (ReportLab buffers, encoded output) on top of what was allocated
+      before it. Pillow allocates pixel buffers outside the Python
+      allocator, so they do not show up here;
+    - RSS growth: how far the process' resident set high-water mark rises
+      while --concurrency threads render --iterations vouchers each, which
+      does include pixel buffers.
+
+The S3 template fetch is replaced by a local stub, as in benchmarks.rendering.
+With --max-peak-kib the run fails (exit status 1) if the traced peak of any
+single-voucher scenario exceeds the budget, so it can guard against
+regressions in CI.
+
+Usage (from the backend directory):
+    python -m benchmarks.memory [--iterations 20] [--concurrency 4]
+        [--template PATH] [--max-peak-kib 512]
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from unittest import mock
+from constants.enums import QRRenderMode, VoucherFormat
+from utils import qr_generator, template_cache
+from benchmarks.rendering import EXPIRY_DATE, LocalTemplate, load_template
+
+BATCH_SIZE = 50
+
+
+def _render_single(voucher_format: VoucherFormat):
+    def render():
+        return qr_generator.render_voucher(
+            str(uuid.uuid4()), EXPIRY_DATE, voucher_format
+        )
+
+    return render
+
+
+def _render_raster():
+    return qr_generator.generate_qr_code(
+        str(uuid.uuid4()), EXPIRY_DATE, qr_mode=QRRenderMode.RASTER
+    ).getvalue()
+
+
+def _render_batch():
+    pages = [(str(uuid.uuid4()), EXPIRY_DATE) for _ in range(BATCH_SIZE)]
+    return qr_generator.render_voucher_pdf_batch(pages)
+
+
+SCENARIOS = {
+    **{
+        voucher_format.value: _render_single(voucher_format)
+        for voucher_format in VoucherFormat
+    },
+    "pdf-raster": _render_raster,
+    f"pdf-batch-{BATCH_SIZE}": _render_batch,
+}
+
+
+def max_rss_kib() -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_scenario(name: str, iterations: int, concurrency: int, template) -> dict:
+    render = SCENARIOS[name]
+    local = LocalTemplate(load_template(template))
+
+    with mock.patch.object(template_cache, "retrieve_template_if_modified", local):
+        render()  # warm up imports, the template and the background caches
+
+        tracemalloc.start()
+        render()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        timings = []
+
+        def worker():
+            for _ in range(iterations):
+                start = time.perf_counter()
+                render()
+                timings.append((time.perf_counter() - start) * 1000)
+
+        rss_before = max_rss_kib()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        rss_growth = max_rss_kib() - rss_before
+
+    return {
+        "name": name,
+        "median_ms": statistics.median(timings),
+        "traced_peak_kib": traced_peak / 1024,
+        "rss_growth_kib": rss_growth,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--template", help="PNG to use instead of a placeholder")
+    parser.add_argument(
+        "--max-peak-kib",
+        type=float,
+        help="exit with status 1 if a single render's traced peak exceeds this",
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        result = run_scenario(
+            args.scenario, args.iterations, args.concurrency, args.template
+        )
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{'scenario':<16}{'median ms':>11}{'traced peak KiB':>17}{'RSS growth KiB':>16}"
+    )
+    over_budget = []
+    for name in SCENARIOS:
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.memory",
+            "--scenario",
+            name,
+            "--iterations",
+            str(args.iterations),
+            "--concurrency",
+            str(args.concurrency),
+        ]
+        if args.template:
+            command += ["--template", args.template]
+        output = subprocess.run(
+            command, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{name:<16}{result['median_ms']:>11.2f}"
+            f"{result['traced_peak_kib']:>17.0f}{result['rss_growth_kib']:>16.0f}"
+        )
+        if (
+            args.max_peak_kib is not None
+            and not name.startswith("pdf-batch")
+            and result["traced_peak_kib"] > args.max_peak_kib
+        ):
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Over the {args.max_peak_kib:.0f} KiB budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
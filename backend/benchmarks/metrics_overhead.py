@@ -0,0 +1,105 @@
+"""
+Measures the overhead of the instrumentation in core.metrics.
+
+Three layers are timed against their uninstrumented baseline:
+    - recording one observation in the registry,
+    - calling a no-op function through the @instrumented decorator,
+    - a request to a trivial route with and without MetricsMiddleware.
+The AWS hooks cost one observation plus two dict operations per call.
+
+Requests are sent in-process through httpx's ASGI transport, so the numbers
+are the framework's own cost with no network in between. httpx is required
+and is not part of requirements.txt.
+
+Usage (from the backend directory):
+    python -m benchmarks.metrics_overhead [--calls 200000] [--requests 3000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from fastapi import FastAPI
+from core.metrics import MetricsMiddleware, instrumented, metrics
+
+
+def per_call_ns(func, calls: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def noop():
+    return None
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/vouchers/{voucher_id}")
+    async def get_voucher(voucher_id: str):
+        return {"voucher_id": voucher_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def request_latencies_us(requests: int) -> tuple[float, float]:
+    """
+    Returns the median latency without and with MetricsMiddleware. Requests
+    to the two apps are interleaved, so drift affects both equally.
+    """
+    import httpx
+
+    clients = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=build_app(with_metrics)),
+            base_url="http://bench",
+        )
+        for with_metrics in (False, True)
+    ]
+    timings: list[list[float]] = [[], []]
+
+    for index in range(requests + 100):
+        for client, client_timings in zip(clients, timings):
+            start = time.perf_counter()
+            await client.get(f"/vouchers/{index}")
+            if index >= 100:  # the first requests warm up both apps
+                client_timings.append((time.perf_counter() - start) * 1_000_000)
+
+    for client in clients:
+        await client.aclose()
+    return statistics.median(timings[0]), statistics.median(timings[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    labels = (("stage", "benchmark"),)
+    observe_ns = per_call_ns(
+        lambda: metrics.observe("stage_duration_seconds", 0.004, labels), args.calls
+    )
+    bare_ns = per_call_ns(noop, args.calls)
+    decorated_ns = per_call_ns(instrumented("benchmark")(noop), args.calls)
+
+    plain, with_middleware = asyncio.run(request_latencies_us(args.requests))
+
+    print(f"registry observe      {observe_ns:>10.0f} ns/call")
+    print(
+        f"@instrumented         {decorated_ns - bare_ns:>10.0f} ns/call overhead"
+        f" ({bare_ns:.0f} ns bare, {decorated_ns:.0f} ns decorated)"
+    )
+    print(
+        f"MetricsMiddleware     {with_middleware - plain:>10.1f} us/request overhead"
+        f" ({plain:.1f} us plain, {with_middleware:.1f} us instrumented,"
+        f" {(with_middleware / plain - 1) * 100:+.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
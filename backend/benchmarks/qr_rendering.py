@@ -0,0 +1,71 @@
+"""
+Compares the vector and raster QR code paths of utils.qr_generator.
+
+Only the QR code is drawn, onto an otherwise empty page, so the numbers do not
+depend on the voucher template or S3.
+
+Usage (from the backend directory):
+    python -m benchmarks.qr_rendering [--iterations 200]
+"""
+
+import argparse
+import io
+import statistics
+import time
+import uuid
+from reportlab.pdfgen import canvas
+from constants.enums import QRRenderMode
+from utils.qr_generator import _build_qr, _draw_qr_raster, _draw_qr_vector
+
+PAGE_SIZE = (1200, 600)
+
+
+def render(unique_id: str, qr_mode: QRRenderMode) -> bytes:
+    pdf_io = io.BytesIO()
+    pdf_canvas = canvas.Canvas(pdf_io, pagesize=PAGE_SIZE)
+    qr = _build_qr(unique_id)
+    if qr_mode == QRRenderMode.RASTER:
+        _draw_qr_raster(pdf_canvas, qr)
+    else:
+        _draw_qr_vector(pdf_canvas, qr)
+    pdf_canvas.showPage()
+    pdf_canvas.save()
+    return pdf_io.getvalue()
+
+
+def benchmark(qr_mode: QRRenderMode, iterations: int) -> dict:
+    ids = [str(uuid.uuid4()) for _ in range(iterations)]
+    render(ids[0], qr_mode)  # warm up imports and font metrics
+
+    timings, sizes = [], []
+    for unique_id in ids:
+        start = time.perf_counter()
+        pdf = render(unique_id, qr_mode)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(pdf))
+
+    timings.sort()
+    return {
+        "mode": qr_mode.value,
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "mean_bytes": statistics.mean(sizes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'median ms':>12}{'p95 ms':>10}{'bytes':>10}")
+    for qr_mode in (QRRenderMode.RASTER, QRRenderMode.VECTOR):
+        result = benchmark(qr_mode, args.iterations)
+        print(
+            f"{result['mode']:<8}{result['median_ms']:>12.2f}"
+            f"{result['p95_ms']:>10.2f}{result['mean_bytes']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
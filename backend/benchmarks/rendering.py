@@ -0,0 +1,305 @@
+"""
+Benchmarks the voucher PDF pipeline of utils.qr_generator stage by stage.
+
+The S3 template fetch is replaced by a local stub, so runs are repeatable and
+need no AWS access. Each scenario renders a single voucher or a multi-page
+batch and reports the total and per-voucher time, the exclusive time spent in
+each pipeline stage, the Python heap peak (tracemalloc) and the output size.
+
+Warm scenarios reuse the per-process template and background caches, as a
+long-lived worker does. The cold scenario clears them before every render, as
+the first render after a template change (or on a new worker) does.
+
+Results can be written as JSON and compared against an earlier run, e.g. the
+one from the previous release:
+    python -m benchmarks.rendering --output current.json --baseline previous.json
+
+Usage (from the backend directory):
+    python -m benchmarks.rendering [--iterations 20] [--batch-sizes 10,50]
+        [--template PATH] [--output PATH] [--baseline PATH]
+        [--max-regression 10] [--profile-dir DIR]
+"""
+
+import argparse
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from unittest import mock
+import PIL
+import reportlab
+from PIL import Image
+from reportlab.pdfgen import canvas
+from constants.enums import QRRenderMode
+from core.profiling import profiled
+from utils import qr_generator, template_cache
+
+EXPIRY_DATE = "2999-12-31T23:59:59"
+
+
+class LocalTemplate:
+    """Serves the template from memory in place of S3, honouring the ETag."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.etag = '"local"'
+
+    def __call__(self, template_name: str, etag=None):
+        if etag == self.etag:
+            return None, self.etag
+        return self.data, self.etag
+
+
+def load_template(path) -> bytes:
+    if path:
+        with open(path, "rb") as template:
+            return template.read()
+
+    # Same size and mode (RGBA, flattened on load) as the production template.
+    template = io.BytesIO()
+    Image.new("RGBA", (1650, 600), (230, 57, 70, 255)).save(template, format="PNG")
+    return template.getvalue()
+
+
+class StageTimer:
+    """
+    Accumulates exclusive wall time per stage: time spent in a nested stage
+    (e.g. drawImage inside the raster QR draw) is only counted once.
+    """
+
+    def __init__(self):
+        self.totals: dict[str, float] = {}
+        self._stack: list[list] = []
+
+    def wrap(self, stage: str, func):
+        def timed(*args, **kwargs):
+            self._stack.append([time.perf_counter(), 0.0])
+            try:
+                return func(*args, **kwargs)
+            finally:
+                start, nested = self._stack.pop()
+                elapsed = time.perf_counter() - start
+                self.totals[stage] = self.totals.get(stage, 0.0) + elapsed - nested
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+
+        return timed
+
+    def reset(self):
+        self.totals = {}
+
+
+def instrument(stack: ExitStack, timer: StageTimer, local: LocalTemplate):
+    targets = [
+        (template_cache, "retrieve_template_if_modified", "template_fetch", local),
+        (template_cache, "_flatten", "template_flatten", None),
+        (qr_generator, "get_template", "template_cache", None),
+        (qr_generator, "_background_image", "background_compress", None),
+        (qr_generator, "_define_background_form", "background_form", None),
+        (qr_generator, "_build_qr", "qr_build", None),
+        (qr_generator, "_draw_qr_vector", "qr_draw", None),
+        (qr_generator, "_draw_qr_raster", "qr_draw", None),
+        (Image.Image, "resize", "qr_resize", None),
+        (canvas.Canvas, "drawImage", "draw_image", None),
+        (canvas.Canvas, "drawString", "text", None),
+        (canvas.Canvas, "showPage", "page_finish", None),
+        (canvas.Canvas, "getpdfdata", "save", None),
+    ]
+    for owner, name, stage, replacement in targets:
+        original = replacement or getattr(owner, name)
+        stack.enter_context(mock.patch.object(owner, name, timer.wrap(stage, original)))
+
+
+def clear_caches():
+    template_cache.clear_templates()
+    qr_generator._background_images.clear()
+
+
+def render(vouchers: int, qr_mode: QRRenderMode, shared_background: bool) -> bytes:
+    pages = [(str(uuid.uuid4()), EXPIRY_DATE) for _ in range(vouchers)]
+    return qr_generator.generate_qr_code_batch(
+        pages, shared_background, qr_mode
+    ).getvalue()
+
+
+def run_scenario(
+    timer: StageTimer,
+    vouchers: int,
+    qr_mode: QRRenderMode,
+    shared_background: bool,
+    cold: bool,
+    iterations: int,
+    profile_dir,
+) -> dict:
+    name = (
+        f"{'cold' if cold else 'warm'}-{vouchers}x-{qr_mode.value}"
+        f"-{'shared' if shared_background else 'inline'}"
+    )
+
+    clear_caches()
+    render(vouchers, qr_mode, shared_background)  # warm up imports and caches
+
+    timings, sizes = [], []
+    timer.reset()
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        start = time.perf_counter()
+        sizes.append(len(render(vouchers, qr_mode, shared_background)))
+        timings.append((time.perf_counter() - start) * 1000)
+    stages = {stage: total * 1000 / iterations for stage, total in timer.totals.items()}
+    stages["other"] = max(statistics.mean(timings) - sum(stages.values()), 0.0)
+
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    render(vouchers, qr_mode, shared_background)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if profile_dir:
+        if cold:
+            clear_caches()
+        with mock.patch("core.config.config.PROFILE_DIR", profile_dir):
+            with profiled(name, "rendering"):
+                render(vouchers, qr_mode, shared_background)
+
+    timings.sort()
+    return {
+        "name": name,
+        "vouchers": vouchers,
+        "qr_mode": qr_mode.value,
+        "shared_background": shared_background,
+        "cache": "cold" if cold else "warm",
+        "iterations": iterations,
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[max(int(len(timings) * 0.95) - 1, 0)],
+        "per_voucher_ms": statistics.median(timings) / vouchers,
+        "stages_ms": dict(sorted(stages.items(), key=lambda stage: -stage[1])),
+        "peak_python_bytes": peak_bytes,
+        "output_bytes": statistics.median(sizes),
+    }
+
+
+def scenarios(batch_sizes: list[int]):
+    yield 1, QRRenderMode.VECTOR, True, True
+    for vouchers in [1] + batch_sizes:
+        yield vouchers, QRRenderMode.VECTOR, True, False
+    yield 1, QRRenderMode.RASTER, True, False
+    yield 1, QRRenderMode.VECTOR, False, False
+    if batch_sizes:
+        yield batch_sizes[-1], QRRenderMode.VECTOR, False, False
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "reportlab": reportlab.Version,
+        "pillow": PIL.__version__,
+    }
+
+
+def compare(results: list[dict], baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path) as baseline_file:
+        baseline = {
+            scenario["name"]: scenario
+            for scenario in json.load(baseline_file)["scenarios"]
+        }
+
+    print(f"\n{'scenario':<28}{'baseline ms':>13}{'current ms':>12}{'change':>9}")
+    regressed = False
+    for result in results:
+        previous = baseline.get(result["name"])
+        if previous is None:
+            continue
+        change = (result["median_ms"] / previous["median_ms"] - 1) * 100
+        flag = ""
+        if max_regression is not None and change > max_regression:
+            flag = "  REGRESSED"
+            regressed = True
+        print(
+            f"{result['name']:<28}{previous['median_ms']:>13.2f}"
+            f"{result['median_ms']:>12.2f}{change:>8.1f}%{flag}"
+        )
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch-sizes", default="10,50")
+    parser.add_argument("--template", help="PNG to use instead of a placeholder")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="exit with status 1 if a median is this many percent slower",
+    )
+    parser.add_argument(
+        "--profile-dir", help="also write a cProfile of each scenario here"
+    )
+    args = parser.parse_args()
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    local = LocalTemplate(load_template(args.template))
+    timer = StageTimer()
+
+    results = []
+    with ExitStack() as stack:
+        instrument(stack, timer, local)
+        print(
+            f"{'scenario':<28}{'median ms':>11}{'p95 ms':>9}{'ms/voucher':>12}"
+            f"{'peak KiB':>10}{'bytes':>10}"
+        )
+        for vouchers, qr_mode, shared_background, cold in scenarios(batch_sizes):
+            result = run_scenario(
+                timer,
+                vouchers,
+                qr_mode,
+                shared_background,
+                cold,
+                args.iterations,
+                args.profile_dir,
+            )
+            results.append(result)
+            print(
+                f"{result['name']:<28}{result['median_ms']:>11.2f}"
+                f"{result['p95_ms']:>9.2f}{result['per_voucher_ms']:>12.2f}"
+                f"{result['peak_python_bytes'] / 1024:>10.0f}"
+                f"{result['output_bytes']:>10.0f}"
+            )
+            print(
+                "    "
+                + ", ".join(
+                    f"{stage} {ms:.2f}" for stage, ms in result["stages_ms"].items()
+                )
+            )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"metadata": metadata(), "scenarios": results}, output, indent=2)
+
+    if args.baseline and compare(results, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Local AWS stand-ins shared by the benchmarks.
+
+A moto server is started in a background thread and the AWS_ENDPOINT_URL_*
+variables are pointed at it, so the application's own boto3 clients talk to it
+unchanged. moto[server] is required and is not part of requirements.txt.
+"""
+
+import atexit
+import io
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("DYNAMODB_TABLE", "vouchers-benchmark")
+os.environ.setdefault("S3_BUCKET", "vouchers-benchmark")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_moto_server(threaded: bool = True) -> str:
+    """
+    Starts a moto server and returns its URL.
+
+    A threaded server runs in its own process, so it does not compete with the
+    code under test for the GIL. With threaded=False requests are handled one
+    at a time on a background thread, which mirrors the per-item write
+    serialization DynamoDB guarantees.
+    """
+    if threaded:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        atexit.register(server.terminate)
+
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("moto server did not start.")
+                time.sleep(0.1)
+        return f"http://127.0.0.1:{port}"
+
+    from moto.moto_server.werkzeug_app import (
+        DomainDispatcherApplication,
+        create_backend_app,
+    )
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    app = DomainDispatcherApplication(create_backend_app)
+    server = make_server("127.0.0.1", 0, app, threaded=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def use_stand_in(services: tuple[str, ...] = ("DYNAMODB", "S3"), threaded=True):
+    """Points the given services at a moto server unless an endpoint is set."""
+    missing = [
+        service for service in services if not os.getenv(f"AWS_ENDPOINT_URL_{service}")
+    ]
+    if missing:
+        url = start_moto_server(threaded)
+        for service in missing:
+            os.environ[f"AWS_ENDPOINT_URL_{service}"] = url
+
+
+def create_table():
+    from core.config import config
+    from infrastructure.dynamodb import dynamodb
+
+    client = dynamodb.meta.client
+    if config.DYNAMODB_TABLE in client.list_tables()["TableNames"]:
+        return
+
+    client.create_table(
+        TableName=config.DYNAMODB_TABLE,
+        KeySchema=[{"AttributeName": "voucher-id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "voucher-id", "AttributeType": "S"},
+            {"AttributeName": "status", "AttributeType": "S"},
+            {"AttributeName": "expiry-date", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": config.DYNAMODB_STATUS_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "status", "KeyType": "HASH"},
+                    {"AttributeName": "expiry-date", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    client.get_waiter("table_exists").wait(TableName=config.DYNAMODB_TABLE)
+    client.update_time_to_live(
+        TableName=config.DYNAMODB_TABLE,
+        TimeToLiveSpecification={
+            "Enabled": True,
+            "AttributeName": config.VOUCHER_TTL_ATTRIBUTE,
+        },
+    )
+
+
+def create_jobs_table():
+    from core.config import config
+    from infrastructure.dynamodb import dynamodb
+
+    client = dynamodb.meta.client
+    if config.DYNAMODB_JOBS_TABLE in client.list_tables()["TableNames"]:
+        return
+
+    client.create_table(
+        TableName=config.DYNAMODB_JOBS_TABLE,
+        KeySchema=[{"AttributeName": "job-id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "job-id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    client.get_waiter("table_exists").wait(TableName=config.DYNAMODB_JOBS_TABLE)
+
+
+def create_template_bucket(size: tuple[int, int] = (1650, 600)):
+    """Creates the S3 bucket with a placeholder voucher template."""
+    from PIL import Image
+    from core.config import config
+    from infrastructure.s3 import s3
+
+    try:
+        s3.create_bucket(Bucket=config.S3_BUCKET)
+    except s3.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    template = io.BytesIO()
+    Image.new("RGBA", size, (230, 57, 70, 255)).save(template, format="PNG")
+    s3.put_object(
+        Bucket=config.S3_BUCKET,
+        Key=f"templates/{config.VOUCHER_TEMPLATE}",
+        Body=template.getvalue(),
+    )
@@ -0,0 +1,81 @@
+"""
+Measures cold vs warm admin token verification in infrastructure.cognito.
+
+Cold calls clear the verified-token cache first, so they pay for the RS256
+signature check and claim validation. Warm calls are served from the cache.
+Signing keys are generated locally and loaded straight into the JWKS store,
+so no network access is needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.token_verification [--iterations 2000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("COGNITO_USER_POOL_ID", "benchmark-pool")
+os.environ.setdefault("COGNITO_CLIENT_ID", "benchmark-client")
+
+import jwt  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from core.config import config  # noqa: E402
+from core.token_cache import token_cache  # noqa: E402
+from infrastructure.cognito import verify_token  # noqa: E402
+from infrastructure.jwks import jwks_store  # noqa: E402
+
+
+def issue_token() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+
+    jwks_store._keys = {"benchmark": jwt.algorithms.RSAAlgorithm.from_jwk(jwk)}
+    jwks_store._fetched_at = jwks_store._attempted_at = time.monotonic()
+
+    return jwt.encode(
+        {
+            "sub": "benchmark-user",
+            "client_id": config.COGNITO_CLIENT_ID,
+            "cognito:groups": ["admin"],
+            "iss": f"https://cognito-idp.{config.AWS_REGION}.amazonaws.com/{config.COGNITO_USER_POOL_ID}",
+            "exp": int(time.time()) + 3600,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "benchmark"},
+    )
+
+
+def measure(credentials: HTTPAuthorizationCredentials, iterations: int, cold: bool):
+    timings = []
+    for _ in range(iterations):
+        if cold:
+            token_cache.clear()
+        start = time.perf_counter()
+        verify_token(credentials)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings), statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=issue_token()
+    )
+
+    print(f"{'path':<6}{'median us':>12}{'mean us':>12}")
+    for label, cold in (("cold", True), ("warm", False)):
+        median, mean = measure(credentials, args.iterations, cold)
+        print(f"{label:<6}{median:>12.1f}{mean:>12.1f}")
+    print(f"cache: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
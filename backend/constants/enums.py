@@ -4,3 +4,71 @@ from enum import Enum
 class VoucherStatus(str, Enum):
     UNUSED = "unused"
     USED = "used"
+    EXPIRED = "expired"
+
+
+class BatchOutputFormat(str, Enum):
+    ZIP = "zip"
+    PDF = "pdf"
+
+
+class BatchItemStatus(str, Enum):
+    SUCCESS = "success"
+    FAILED = "failed"
+    DUPLICATE = "duplicate"
+
+
+class QRRenderMode(str, Enum):
+    VECTOR = "vector"
+    RASTER = "raster"
+
+
+class VoucherFormat(str, Enum):
+    PDF = "pdf"
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+
+
+VOUCHER_MEDIA_TYPES = {
+    VoucherFormat.PDF: "application/pdf",
+    VoucherFormat.PNG: "image/png",
+    VoucherFormat.JPEG: "image/jpeg",
+    VoucherFormat.WEBP: "image/webp",
+}
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ClaimResult(str, Enum):
+    CLAIMED = "claimed"
+    ALREADY_USED = "already_used"
+    EXPIRED = "expired"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobQueueBackend(str, Enum):
+    INPROCESS = "inprocess"
+    SQS = "sqs"
+
+
+class CacheBackend(str, Enum):
+    MEMORY = "memory"
+    REDIS = "redis"
+    NONE = "none"
+
+
+class ProfilerBackend(str, Enum):
+    CPROFILE = "cprofile"
+    PYINSTRUMENT = "pyinstrument"
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,12 +9,153 @@ class Config:
     AWS_REGION = os.getenv("AWS_REGION")
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
+    # Shared by every boto3 client, see infrastructure/aws.py. The pool should
+    # cover the threads calling one service at once (IO_POOL_SIZE plus the
+    # batch concurrency settings); beyond it, extra connections are opened per
+    # call and closed afterwards.
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", 50))
+    AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", 2))
+    AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", 10))
+    AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+    AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", 3))
+    AWS_TCP_KEEPALIVE = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
     DYNAMODB_TABLE = os.getenv("DYNAMODB_TABLE")
+    DYNAMODB_STATUS_INDEX = os.getenv(
+        "DYNAMODB_STATUS_INDEX", "status-expiry-date-index"
+    )
+    VOUCHER_PAGE_SIZE = int(os.getenv("VOUCHER_PAGE_SIZE", 50))
+    VOUCHER_PAGE_MAX_SIZE = int(os.getenv("VOUCHER_PAGE_MAX_SIZE", 500))
+    CLAIM_BATCH_MAX_SIZE = int(os.getenv("CLAIM_BATCH_MAX_SIZE", 100))
+    CLAIM_BATCH_CONCURRENCY = int(os.getenv("CLAIM_BATCH_CONCURRENCY", 10))
+    # Epoch-seconds attribute the table's TTL is enabled on. DynamoDB deletes a
+    # voucher VOUCHER_TTL_DAYS after it expires, which only catches what the
+    # sweeper has not already archived VOUCHER_ARCHIVE_AFTER_DAYS after expiry.
+    VOUCHER_TTL_ATTRIBUTE = os.getenv("VOUCHER_TTL_ATTRIBUTE", "ttl")
+    VOUCHER_TTL_DAYS = int(os.getenv("VOUCHER_TTL_DAYS", 90))
+    VOUCHER_ARCHIVE_AFTER_DAYS = int(os.getenv("VOUCHER_ARCHIVE_AFTER_DAYS", 30))
+    VOUCHER_ARCHIVE_PREFIX = os.getenv("VOUCHER_ARCHIVE_PREFIX", "archive/vouchers/")
+    SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", 500))
+    SWEEP_CONCURRENCY = int(os.getenv("SWEEP_CONCURRENCY", 10))
+    # Under Lambda the sweep runs on an EventBridge schedule instead.
+    SWEEP_INTERVAL = float(
+        os.getenv(
+            "SWEEP_INTERVAL", 0 if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else 3600
+        )
+    )
+    EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", 1000))
+    EXPORT_MAX_SEGMENTS = int(os.getenv("EXPORT_MAX_SEGMENTS", 8))
     COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
     COGNITO_CLIENT_SECRET = os.getenv("COGNITO_CLIENT_SECRET")
     COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID")
     COGNITO_KEYS_URL = os.getenv("COGNITO_KEYS_URL")
+    JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", 3600))
+    JWKS_MIN_REFRESH_INTERVAL = int(os.getenv("JWKS_MIN_REFRESH_INTERVAL", 30))
+    JWKS_TIMEOUT = float(os.getenv("JWKS_TIMEOUT", 5))
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 1024))
+    VOUCHER_CACHE_BACKEND = os.getenv("VOUCHER_CACHE_BACKEND", "memory")
+    VOUCHER_CACHE_SIZE = int(os.getenv("VOUCHER_CACHE_SIZE", 4096))
+    # With the in-process backend, this is also how long another instance may
+    # keep showing a voucher claimed elsewhere as unused.
+    VOUCHER_CACHE_TTL = float(os.getenv("VOUCHER_CACHE_TTL", 10))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", 0.5))
     S3_BUCKET = os.getenv("S3_BUCKET")
+    VOUCHER_PDF_PREFIX = os.getenv("VOUCHER_PDF_PREFIX", "vouchers/")
+    PRESIGNED_URL_TTL = int(os.getenv("PRESIGNED_URL_TTL", 300))
+    ARTIFACT_UPLOAD_CONCURRENCY = int(os.getenv("ARTIFACT_UPLOAD_CONCURRENCY", 10))
+    # Set RENDER_CACHE_ENABLED=false to always render from scratch.
+    RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+    RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    # The disk tier is on by default only under Lambda, where /tmp outlives
+    # the invocation but memory is scarce.
+    RENDER_CACHE_DIR = os.getenv(
+        "RENDER_CACHE_DIR",
+        (
+            os.path.join(tempfile.gettempdir(), "voucher-renders")
+            if os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+            else ""
+        ),
+    )
+    RENDER_CACHE_DISK_MAX_BYTES = int(
+        os.getenv("RENDER_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)
+    )
+    VOUCHER_TEMPLATE = os.getenv("VOUCHER_TEMPLATE", "voucher-atletika.png")
+    TEMPLATE_CACHE_TTL = int(os.getenv("TEMPLATE_CACHE_TTL", 300))
+    # Preloading on startup would put S3 and the PDF stack on every Lambda cold
+    # start, so it is off by default there.
+    PRELOAD_TEMPLATES = [
+        name.strip()
+        for name in os.getenv(
+            "PRELOAD_TEMPLATES",
+            "" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else VOUCHER_TEMPLATE,
+        ).split(",")
+        if name.strip()
+    ]
+    EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
+    EMAIL_APP_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 2))
+    # Lambda freezes background threads between invocations, so emails are
+    # sent synchronously there.
+    EMAIL_ASYNC_DELIVERY = (
+        os.getenv(
+            "EMAIL_ASYNC_DELIVERY",
+            "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true",
+        ).lower()
+        == "true"
+    )
+    EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", 1000))
+    EMAIL_ENQUEUE_TIMEOUT = float(os.getenv("EMAIL_ENQUEUE_TIMEOUT", 5))
+    EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", 2))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 20))
+    EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", 3))
+    EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", 1))
+    # How long shutdown waits for queued emails before dropping the rest.
+    EMAIL_DRAIN_TIMEOUT = float(os.getenv("EMAIL_DRAIN_TIMEOUT", 30))
+    IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", 32))
+    RENDER_POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", os.cpu_count() or 1))
+    # Renders queued or running at once; each holds its output in memory.
+    RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", 256))
+    RENDER_QUEUE_TIMEOUT = float(os.getenv("RENDER_QUEUE_TIMEOUT", 30))
+    VOUCHER_BATCH_MAX_SIZE = int(os.getenv("VOUCHER_BATCH_MAX_SIZE", 500))
+    DYNAMODB_JOBS_TABLE = os.getenv("DYNAMODB_JOBS_TABLE", "voucher-jobs")
+    JOBS_PREFIX = os.getenv("JOBS_PREFIX", "jobs/")
+    # In-process workers are frozen between Lambda invocations, so jobs go
+    # through SQS there.
+    JOB_QUEUE_BACKEND = os.getenv(
+        "JOB_QUEUE_BACKEND",
+        "sqs" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "inprocess",
+    )
+    JOB_QUEUE_URL = os.getenv("JOB_QUEUE_URL")
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+    JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 50))
+    JOB_MAX_SIZE = int(os.getenv("JOB_MAX_SIZE", 10000))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    # A running job is leased to its worker for this long, renewed after every
+    # chunk; another worker only takes it over once the lease has lapsed.
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+    # Delay before the in-process queue retries a failed or leased job.
+    JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 5))
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 100))
+    IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", 2000))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Lambda has no long-lived process to scrape, so metrics are written to
+    # CloudWatch as embedded metric format log lines there instead.
+    METRICS_EMF = (
+        os.getenv(
+            "METRICS_EMF", "true" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "false"
+        ).lower()
+        == "true"
+    )
+    METRICS_NAMESPACE = os.getenv("METRICS_NAMESPACE", "VoucherService")
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILER = os.getenv("PROFILER", "cprofile")
+    PROFILE_DIR = os.getenv(
+        "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "voucher-profiles")
+    )
 
 
 config = Config()
@@ -0,0 +1,165 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from core.config import config
+from core.metrics import record_stage
+from core.profiling import with_profiling
+
+_render_pool: Optional[Executor] = None
+_render_pool_lock = threading.Lock()
+_render_slots = threading.BoundedSemaphore(config.RENDER_MAX_PENDING)
+_pending_renders = 0
+_pending_lock = threading.Lock()
+
+
+def _process_context():
+    # The app runs I/O and email threads by the time the pool starts, and
+    # forking a multi-threaded process can leave locks held in the child.
+    # forkserver starts workers from a clean single-threaded process instead.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _init_render_worker():
+    # Render workers do not share the parent's template cache, so each one
+    # loads the templates as it starts rather than on its first render.
+    if config.PRELOAD_TEMPLATES:
+        from utils.template_cache import preload_templates
+
+        preload_templates(config.PRELOAD_TEMPLATES)
+
+
+def get_render_pool() -> Executor:
+    """
+    Returns the shared pool used for CPU-bound voucher rendering.
+
+    The pool is created on first use and sized by RENDER_POOL_SIZE, which
+    defaults to the number of available cores. Environments without POSIX
+    semaphores (e.g. AWS Lambda) fall back to a thread pool. Every worker
+    preloads PRELOAD_TEMPLATES as it starts.
+    """
+    global _render_pool
+
+    with _render_pool_lock:
+        if _render_pool is None:
+            try:
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=config.RENDER_POOL_SIZE,
+                    mp_context=_process_context(),
+                    initializer=_init_render_worker,
+                )
+            except (OSError, NotImplementedError):
+                _render_pool = ThreadPoolExecutor(
+                    max_workers=config.RENDER_POOL_SIZE,
+                    initializer=_init_render_worker,
+                )
+
+    return _render_pool
+
+
+def start_render_workers():
+    """
+    Starts every render worker in the background, so they have preloaded the
+    templates before the first request instead of during it.
+    """
+    pool = get_render_pool()
+    # Both pools start a new worker per submit while none is idle, up to
+    # their size.
+    for _ in range(config.RENDER_POOL_SIZE):
+        pool.submit(int)
+
+
+def _discard_render_pool(pool: Executor):
+    """
+    Drops a broken pool, so the next render starts a fresh one instead of
+    failing for the rest of the process' life. A worker that dies (e.g. out of
+    memory) breaks a ProcessPoolExecutor for good.
+    """
+    global _render_pool
+
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _release_render_slot():
+    global _pending_renders
+
+    with _pending_lock:
+        _pending_renders -= 1
+    _render_slots.release()
+
+
+def submit_render(func: Callable[..., Any], *args) -> Future:
+    """
+    Submits a render to the pool, profiled if the current request is.
+
+    The time until the render completes, including any wait for a free
+    worker, is recorded as the "render" stage.
+
+    At most RENDER_MAX_PENDING renders are queued or running at once, so a
+    burst of requests cannot grow the pool's queue, and the memory its
+    arguments and results hold, without limit. Beyond that, submitting waits
+    up to RENDER_QUEUE_TIMEOUT for a slot and then fails with a 503.
+    """
+    global _pending_renders
+
+    if not _render_slots.acquire(timeout=config.RENDER_QUEUE_TIMEOUT):
+        raise HTTPException(
+            status_code=503, detail="Rendering capacity exhausted, try again later."
+        )
+    with _pending_lock:
+        _pending_renders += 1
+    start = time.perf_counter()
+
+    pool = get_render_pool()
+
+    def record(future: Future):
+        _release_render_slot()
+        error = None
+        if future.cancelled():
+            error = "CancelledError"
+        elif future.exception() is not None:
+            error = type(future.exception()).__name__
+            if isinstance(future.exception(), BrokenProcessPool):
+                _discard_render_pool(pool)
+        record_stage("render", time.perf_counter() - start, error)
+
+    try:
+        try:
+            future = pool.submit(with_profiling(func, *args))
+        except BrokenProcessPool:
+            # Broke since the last render finished; retried once on a new pool.
+            _discard_render_pool(pool)
+            pool = get_render_pool()
+            future = pool.submit(with_profiling(func, *args))
+    except BaseException:
+        _release_render_slot()
+        raise
+    future.add_done_callback(record)
+    return future
+
+
+def pending_renders() -> int:
+    """Returns the number of renders queued or running."""
+    return _pending_renders
+
+
+def shutdown_render_pool():
+    global _render_pool
+
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True)
+            _render_pool = None
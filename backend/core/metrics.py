@@ -0,0 +1,353 @@
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+from core.config import config
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+# CloudWatch accepts at most 100 values per metric in one EMF document.
+EMF_MAX_VALUES = 100
+
+METRIC_HELP = {
+    "http_request_duration_seconds": "Request latency by route and status.",
+    "http_request_errors_total": "Requests answered with a 5xx status.",
+    "stage_duration_seconds": "Latency of instrumented hot-path stages.",
+    "stage_errors_total": "Failures of instrumented hot-path stages.",
+    "vouchers_expired_total": "Unused vouchers moved to the expired status.",
+    "vouchers_archived_total": "Expired vouchers archived to S3 and deleted.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count", "recent")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: list[float] = []
+
+
+class MetricsRegistry:
+    """
+    Thread-safe latency histograms and counters.
+
+    Observing a value is a bucket bisect and a few increments under a lock, so
+    instrumentation can stay on in production. The registry renders itself in
+    the Prometheus text format and, for Lambda, as CloudWatch embedded metric
+    format (EMF) log lines holding what was observed since the last flush.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._flushed_counters: dict[tuple[str, Labels], float] = {}
+        self._collectors: list[Callable[[], Iterable[tuple]]] = []
+        self._emf = config.METRICS_EMF
+
+    def observe(self, name: str, seconds: float, labels: Labels = ()):
+        key = (name, labels)
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+            if self._emf and len(histogram.recent) < EMF_MAX_VALUES:
+                histogram.recent.append(seconds)
+
+    def increment(self, name: str, labels: Labels = (), value: float = 1):
+        with self._lock:
+            self._counters[(name, labels)] = (
+                self._counters.get((name, labels), 0) + value
+            )
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """
+        Registers a callback read on every scrape, for values owned elsewhere
+        (e.g. cache statistics). It returns (name, type, value, labels) tuples,
+        where type is "counter" or "gauge".
+        """
+        self._collectors.append(collector)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            histograms = [
+                (name, labels, list(h.counts), h.sum, h.count)
+                for (name, labels), h in self._histograms.items()
+            ]
+            counters = list(self._counters.items())
+
+        lines = []
+        described = set()
+
+        def describe(name: str, metric_type: str):
+            if name not in described:
+                described.add(name)
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        for name, labels, counts, total, count in sorted(histograms):
+            describe(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters):
+            describe(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for collector in self._collectors:
+            for name, metric_type, value, labels in collector():
+                describe(name, metric_type)
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def flush_emf(self) -> list[str]:
+        """
+        Returns EMF documents for the values observed since the last flush.
+        Printed to stdout under Lambda, CloudWatch turns them into metrics.
+        """
+        timestamp = int(time.time() * 1000)
+        documents = []
+
+        with self._lock:
+            for (name, labels), histogram in self._histograms.items():
+                if histogram.recent:
+                    documents.append(
+                        _emf(timestamp, name, "Seconds", histogram.recent, labels)
+                    )
+                    histogram.recent = []
+
+            for key, value in self._counters.items():
+                delta = value - self._flushed_counters.get(key, 0)
+                if delta:
+                    documents.append(_emf(timestamp, key[0], "Count", delta, key[1]))
+                    self._flushed_counters[key] = value
+
+        return [json.dumps(document) for document in documents]
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._flushed_counters.clear()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{key}="{_escape(value)}"' for key, value in labels if value is not None
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _emf(timestamp: int, name: str, unit: str, value: Any, labels: Labels) -> dict:
+    return {
+        "_aws": {
+            "Timestamp": timestamp,
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": config.METRICS_NAMESPACE,
+                    "Dimensions": [[key for key, _ in labels]],
+                    "Metrics": [{"Name": name, "Unit": unit}],
+                }
+            ],
+        },
+        **{key: str(label) for key, label in labels},
+        name: value,
+    }
+
+
+metrics = MetricsRegistry()
+
+
+def record_stage(stage: str, seconds: float, error: Optional[str] = None):
+    metrics.observe("stage_duration_seconds", seconds, (("stage", stage),))
+    if error is not None:
+        metrics.increment("stage_errors_total", (("stage", stage), ("error", error)))
+
+
+class timed:
+    """
+    Records the latency of the block, and a failure if it raises.
+
+    A plain class rather than @contextmanager, which costs several times more
+    per use on hot paths.
+    """
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        record_stage(
+            self.stage,
+            time.perf_counter() - self.start,
+            exc_type.__name__ if exc_type is not None else None,
+        )
+        return False
+
+
+def instrumented(stage: str):
+    """Records the latency and failures of every call to the decorated function."""
+
+    def decorator(func):
+        if not config.METRICS_ENABLED:
+            return func
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    record_stage(stage, time.perf_counter() - start, type(e).__name__)
+                    raise
+                record_stage(stage, time.perf_counter() - start)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                record_stage(stage, time.perf_counter() - start, type(e).__name__)
+                raise
+            record_stage(stage, time.perf_counter() - start)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _before_aws_call(model, context: dict, **kwargs):
+    context["metrics_call"] = (
+        f"{model.service_model.endpoint_prefix}.{model.name}",
+        time.perf_counter(),
+    )
+
+
+def _after_aws_call(http_response, parsed: dict, context: dict, **kwargs):
+    call = context.pop("metrics_call", None)
+    if call is None:
+        return
+    stage, started = call
+    error = None
+    # Anything below 400 is a success, including the 304 that answers a
+    # conditional GET (see retrieve_template_if_modified).
+    if http_response.status_code >= 400:
+        error = parsed.get("Error", {}).get("Code") or str(http_response.status_code)
+    record_stage(stage, time.perf_counter() - started, error)
+
+
+def _after_aws_call_error(exception: Exception, context: dict, **kwargs):
+    call = context.pop("metrics_call", None)
+    if call is not None:
+        stage, started = call
+        record_stage(stage, time.perf_counter() - started, type(exception).__name__)
+
+
+def instrument_boto_client(client):
+    """
+    Records every API call made through a boto3 client as a stage named after
+    the service and operation, e.g. dynamodb.GetItem. Retries are included
+    in the call's latency.
+    """
+    if not config.METRICS_ENABLED:
+        return client
+    client.meta.events.register("before-call", _before_aws_call)
+    client.meta.events.register("after-call", _after_aws_call)
+    client.meta.events.register("after-call-error", _after_aws_call_error)
+    return client
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every request by method, route template and
+    status, and counts 5xx answers.
+
+    Implemented as plain ASGI middleware so it adds no task or stream
+    wrapping of its own to the request path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route on the scope, so the label
+            # is the path template rather than the raw, unbounded path.
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            labels = (("method", scope["method"]), ("route", path))
+            metrics.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - start,
+                labels + (("status", str(status)),),
+            )
+            if status >= 500:
+                metrics.increment("http_request_errors_total", labels)
@@ -0,0 +1,120 @@
+import contextvars
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+from starlette.middleware.base import BaseHTTPMiddleware
+from core.config import config
+from constants.enums import ProfilerBackend
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_profile_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "profile_id", default=None
+)
+_sequence = itertools.count()
+
+
+def current_profile_id() -> Optional[str]:
+    return _profile_id.get()
+
+
+@contextmanager
+def profiled(label: str, profile_id: Optional[str] = None):
+    """
+    Profiles the block and writes the result to PROFILE_DIR.
+
+    Does nothing unless a profile ID is given or the current request is being
+    profiled. cProfile output (.prof) can be read with pstats or snakeviz;
+    pyinstrument, if installed and selected with PROFILER, writes HTML.
+    """
+    profile_id = profile_id or current_profile_id()
+    if profile_id is None:
+        yield
+        return
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(
+        config.PROFILE_DIR,
+        f"{profile_id}.{label}.{os.getpid()}.{next(_sequence)}",
+    )
+
+    if config.PROFILER == ProfilerBackend.PYINSTRUMENT.value:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed, falling back to cProfile.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(f"{path}.html", "w") as output:
+                    output.write(profiler.output_html())
+            return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active cProfile per process.
+        logger.warning("Another profiler is active, not profiling '%s'.", label)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{path}.prof")
+
+
+def run_profiled(profile_id: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Picklable wrapper that profiles a call made on a pool worker."""
+    with profiled(getattr(func, "__name__", "call"), profile_id):
+        return func(*args, **kwargs)
+
+
+def with_profiling(func: Callable[..., Any], *args, **kwargs) -> Callable[[], Any]:
+    """
+    Binds a call for another thread or process, profiling it there if the
+    current request is being profiled.
+    """
+    profile_id = current_profile_id()
+    if profile_id is None:
+        return functools.partial(func, *args, **kwargs)
+    return functools.partial(run_profiled, profile_id, func, *args, **kwargs)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profiles requests sent with an "X-Profile: true" header.
+
+    The event loop, the I/O thread running the handler's blocking work and any
+    render pool worker each write their own profile, all prefixed with the ID
+    returned in the X-Profile-Id response header. Only installed when
+    PROFILING_ENABLED is set.
+    """
+
+    async def dispatch(self, request, call_next):
+        if request.headers.get(PROFILE_HEADER, "").lower() != "true":
+            return await call_next(request)
+
+        profile_id = uuid.uuid4().hex
+        token = _profile_id.set(profile_id)
+        try:
+            with profiled("request"):
+                response = await call_next(request)
+        finally:
+            _profile_id.reset(token)
+
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def render_key(*parts: str) -> str:
+    """
+    Builds a cache key from everything a render depends on, e.g. template
+    ETag, voucher ID, expiry date, format and renderer version.
+    """
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Rendered vouchers keyed by content, so a resend, re-download or retried
+    job chunk returns the earlier output instead of rendering again.
+
+    A per-process LRU bounded by total bytes sits in front of an optional
+    directory (RENDER_CACHE_DIR), which is shared by every process on the
+    host and survives warm Lambda invocations. The directory is bounded by
+    total bytes as well, evicting the least recently used files. Disk hits
+    are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = config.RENDER_CACHE_MAX_BYTES,
+        directory: Optional[str] = config.RENDER_CACHE_DIR,
+        max_disk_bytes: int = config.RENDER_CACHE_DISK_MAX_BYTES,
+    ):
+        self._max_bytes = max_bytes
+        self._directory = directory or None
+        self._max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._disk_size: Optional[int] = None
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: bytes):
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def _put_memory(self, key: str, value: bytes):
+        # A single output larger than the whole budget would only evict
+        # everything else.
+        if len(value) > self._max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self._directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached:
+                value = cached.read()
+            # The modification time doubles as the last use for eviction.
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.warning("Render cache read failed.", exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return None
+
+    def _write_disk(self, key: str, value: bytes):
+        if self._directory is None or len(value) > self._max_disk_bytes:
+            return
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            # Written under a temporary name and renamed, so other processes
+            # never read a partial file.
+            descriptor, temporary = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as cached:
+                cached.write(value)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            logger.warning("Render cache write failed.", exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return
+
+        with self._disk_lock:
+            if self._disk_size is None:
+                self._disk_size = self._scan_disk_size()
+            else:
+                self._disk_size += len(value)
+            if self._disk_size > self._max_disk_bytes:
+                self._evict_disk()
+
+    def _files(self) -> list[tuple[float, int, str]]:
+        files = []
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _scan_disk_size(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def _evict_disk(self):
+        # Other processes write to the same directory, so the size is
+        # recounted from the files, and trimmed to 90% of the budget to make
+        # the next scan less frequent.
+        files = sorted(self._files())
+        size = sum(size for _, size, _ in files)
+        target = self._max_disk_bytes * 0.9
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+            self.disk_evictions += 1
+        self._disk_size = size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self._directory is not None and os.path.isdir(self._directory):
+            with self._disk_lock:
+                for _, _, path in self._files():
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._disk_size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "errors": self.errors,
+                "size": len(self._entries),
+                "bytes": self._size,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+
+render_cache = RenderCache()
+
+_template_etags: dict[str, tuple[str, float]] = {}
+_template_etags_lock = threading.Lock()
+
+
+def template_etag(template_name: str) -> str:
+    """
+    Returns the ETag of a template for looking up renders of it, from a HEAD
+    request cached for TEMPLATE_CACHE_TTL seconds, so the request process
+    never downloads or decodes the template itself.
+
+    Raises:
+        Exception: If the template cannot be looked up.
+    """
+    from infrastructure.s3 import retrieve_template_etag
+
+    now = time.monotonic()
+    with _template_etags_lock:
+        cached = _template_etags.get(template_name)
+    if cached is not None and now - cached[1] < config.TEMPLATE_CACHE_TTL:
+        return cached[0]
+
+    etag = retrieve_template_etag(template_name)
+    with _template_etags_lock:
+        _template_etags[template_name] = (etag, now)
+    return etag
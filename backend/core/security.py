@@ -3,19 +3,13 @@ from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from services.auth_service import calculate_secret_hash
 from core.config import config
+from infrastructure.jwks import jwks_store
 import requests
 
 security = HTTPBearer()
 
 
-def get_cognito_public_keys():
-    response = requests.get(config.COGNITO_KEYS_URL)
-    response.raise_for_status()
-    return {key["kid"]: key for key in response.json()["keys"]}
-
-
 def verify_token(auth: HTTPAuthorizationCredentials = Security(security)):
-    cognito_keys = get_cognito_public_keys()
     token = auth.credentials
 
     try:
@@ -23,11 +17,10 @@ def verify_token(auth: HTTPAuthorizationCredentials = Security(security)):
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
 
-        if kid not in cognito_keys:
-            raise HTTPException(status_code=401, detail="Invalid token header.")
-
         # Get public key
-        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(cognito_keys[kid])
+        public_key = jwks_store.get_key(kid)
+        if public_key is None:
+            raise HTTPException(status_code=401, detail="Invalid token header.")
 
         payload = jwt.decode(
             token,
@@ -52,3 +45,7 @@ def verify_token(auth: HTTPAuthorizationCredentials = Security(security)):
         raise HTTPException(status_code=401, detail="Token expired.")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token.")
+    except requests.RequestException:
+        raise HTTPException(
+            status_code=503, detail="Unable to fetch token signing keys."
+        )
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from core.config import config
+
+
+class VerifiedTokenCache:
+    """
+    A bounded LRU cache of verified token payloads.
+
+    Entries are keyed by a SHA-256 hash of the token, so raw bearer tokens are
+    never held in memory, and each entry expires at its token's `exp` claim.
+    """
+
+    def __init__(self, max_size: int = config.TOKEN_CACHE_SIZE):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None and payload["exp"] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return payload
+
+            if payload is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: dict):
+        if self._max_size <= 0 or "exp" not in payload:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token: str):
+        with self._lock:
+            self._entries.pop(self._key(token), None)
+
+    def invalidate_subject(self, subject: str):
+        """Drops every cached token issued to a user, e.g. after a global sign-out."""
+        with self._lock:
+            for key in [
+                key
+                for key, payload in self._entries.items()
+                if payload.get("sub") == subject
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = VerifiedTokenCache()
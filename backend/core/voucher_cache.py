@@ -0,0 +1,193 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from core.config import config
+from constants.enums import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheStats:
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class MemoryVoucherCache(_CacheStats):
+    """
+    A bounded, per-process LRU of voucher details with a TTL.
+
+    Writes made by this process (claims, issuance) update it directly. Writes
+    made by other instances are only seen once the entry expires, so the TTL
+    bounds how long another instance can show a claimed voucher as unused.
+    """
+
+    backend = CacheBackend.MEMORY.value
+
+    def __init__(
+        self,
+        max_size: int = config.VOUCHER_CACHE_SIZE,
+        ttl: float = config.VOUCHER_CACHE_TTL,
+    ):
+        super().__init__()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, voucher_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(voucher_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(voucher_id)
+                self._count("hits")
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[voucher_id]
+        self._count("misses")
+        return None
+
+    def put(self, voucher_id: str, voucher: dict, only_if_absent: bool = False):
+        if self._max_size <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(voucher_id)
+            if only_if_absent and entry is not None and entry[0] > now:
+                return
+
+            self._entries[voucher_id] = (now + self._ttl, voucher)
+            self._entries.move_to_end(voucher_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    def invalidate(self, voucher_id: str):
+        with self._lock:
+            self._entries.pop(voucher_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._lock:
+            stats["size"] = len(self._entries)
+        return stats
+
+
+class RedisVoucherCache(_CacheStats):
+    """
+    Voucher details in a Redis-compatible store shared by every instance, so a
+    claim made anywhere is seen everywhere at once.
+
+    Requires the redis package, which is not part of requirements.txt. If the
+    store is unreachable, lookups fall through to DynamoDB.
+    """
+
+    backend = CacheBackend.REDIS.value
+    KEY_PREFIX = "voucher:"
+
+    def __init__(
+        self, url: str = config.REDIS_URL, ttl: float = config.VOUCHER_CACHE_TTL
+    ):
+        super().__init__()
+        import redis
+
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=config.REDIS_TIMEOUT,
+            socket_connect_timeout=config.REDIS_TIMEOUT,
+        )
+        self._ttl = ttl
+
+    def get(self, voucher_id: str) -> Optional[dict]:
+        try:
+            value = self._client.get(self.KEY_PREFIX + voucher_id)
+        except Exception:
+            logger.warning("Voucher cache lookup failed.", exc_info=True)
+            self._count("errors")
+            value = None
+
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return json.loads(value)
+
+    def put(self, voucher_id: str, voucher: dict, only_if_absent: bool = False):
+        try:
+            self._client.set(
+                self.KEY_PREFIX + voucher_id,
+                json.dumps(voucher),
+                px=int(self._ttl * 1000),
+                nx=only_if_absent,
+            )
+        except Exception:
+            logger.warning("Voucher cache write failed.", exc_info=True)
+            self._count("errors")
+
+    def invalidate(self, voucher_id: str):
+        try:
+            self._client.delete(self.KEY_PREFIX + voucher_id)
+        except Exception:
+            # The entry expires after the TTL regardless.
+            logger.warning("Voucher cache invalidation failed.", exc_info=True)
+            self._count("errors")
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.KEY_PREFIX + "*"):
+            self._client.delete(key)
+
+
+class NullVoucherCache(_CacheStats):
+    backend = CacheBackend.NONE.value
+
+    def get(self, voucher_id: str) -> Optional[dict]:
+        self._count("misses")
+        return None
+
+    def put(self, voucher_id: str, voucher: dict, only_if_absent: bool = False):
+        pass
+
+    def invalidate(self, voucher_id: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+def create_voucher_cache():
+    if config.VOUCHER_CACHE_BACKEND == CacheBackend.REDIS.value:
+        return RedisVoucherCache()
+    if config.VOUCHER_CACHE_BACKEND == CacheBackend.NONE.value:
+        return NullVoucherCache()
+    return MemoryVoucherCache()
+
+
+voucher_cache = create_voucher_cache()
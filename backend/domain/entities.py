@@ -1,10 +1,51 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Optional
 from constants.enums import VoucherStatus
+from core.config import config
 from fastapi import HTTPException
 
+# Domain field -> DynamoDB attribute, in the order of the Voucher fields. This is
+# the only place the two naming schemes are mapped onto each other.
+VOUCHER_ATTRIBUTES = {
+    "voucher_id": "voucher-id",
+    "first_name": "first-name",
+    "last_name": "last-name",
+    "expiry_date": "expiry-date",
+    "percentage": "percentage",
+    "status": "status",
+}
 
-@dataclass
+_item_values = itemgetter(*VOUCHER_ATTRIBUTES.values())
+
+
+def canonical_datetime(value) -> str:
+    """
+    Returns an ISO 8601 datetime string or datetime in the one form expiry
+    dates are stored and compared in: naive server-local time to the second,
+    e.g. "2024-12-31T23:59:59".
+
+    DynamoDB compares strings byte by byte, so the claim condition, the
+    status/expiry-date GSI ranges and the expiry sweep only order dates
+    correctly when every value has this fixed layout. Aware values are
+    converted to local time first.
+
+    Raises:
+        ValueError: If a string is not an ISO 8601 datetime.
+    """
+    moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment.isoformat(timespec="seconds")
+
+
+def canonical_now() -> str:
+    """Returns the current time in the canonical_datetime form."""
+    return canonical_datetime(datetime.now())
+
+
+@dataclass(slots=True)
 class Voucher:
     voucher_id: str
     first_name: str
@@ -13,11 +54,47 @@ class Voucher:
     percentage: str
     status: str = VoucherStatus.UNUSED.value
 
+    @classmethod
+    def from_item(cls, item: dict) -> "Voucher":
+        """Builds a voucher from a DynamoDB item holding at least VOUCHER_ATTRIBUTES."""
+        return cls(*_item_values(item))
+
+    def to_item(self) -> dict:
+        item = {
+            attribute: getattr(self, field)
+            for field, attribute in VOUCHER_ATTRIBUTES.items()
+        }
+        ttl = self.ttl()
+        if ttl is not None:
+            item[config.VOUCHER_TTL_ATTRIBUTE] = ttl
+        return item
+
+    def ttl(self) -> Optional[int]:
+        """
+        Returns the epoch second after which DynamoDB may delete the voucher,
+        or None if that falls past the end of the calendar, as it does for
+        "never expires" dates like "9999-12-31T23:59:59".
+        """
+        expiry = datetime.fromisoformat(self.expiry_date)
+        try:
+            deletion = expiry + timedelta(days=config.VOUCHER_TTL_DAYS)
+        except OverflowError:
+            return None
+        return int(deletion.timestamp())
+
+    def is_used(self) -> bool:
+        return self.status == VoucherStatus.USED.value
+
+    def is_expired(self) -> bool:
+        if self.status == VoucherStatus.EXPIRED.value:
+            return True
+        return canonical_now() > canonical_datetime(self.expiry_date)
+
     def mark_as_used(self):
-        if self.status == VoucherStatus.USED.value:
+        if self.is_used():
             raise HTTPException(
                 status_code=400, detail="Voucher has already been claimed."
             )
-        if datetime.now() > datetime.fromisoformat(self.expiry_date):
+        if self.is_expired():
             raise HTTPException(status_code=400, detail="Voucher has expired.")
         self.status = VoucherStatus.USED.value
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, validator
-from datetime import datetime
+import re
+from pydantic import BaseModel, ConfigDict, Field, validator
+from typing import Optional
+from core.config import config
+from domain.entities import canonical_datetime
 
 
 class LoginRequest(BaseModel):
@@ -28,25 +31,107 @@ class VoucherDetails(BaseModel):
     @validator("expiry_date")
     @classmethod
     def validate_expiry_date(cls, value):
-        """Ensure expiry_date is a valid ISO 8601 datetime string."""
+        """Ensure expiry_date is a valid ISO 8601 datetime string and canonicalize it."""
         try:
-            datetime.fromisoformat(value)  # Validates ISO format
-            return value
+            return canonical_datetime(value)
         except ValueError:
             raise ValueError(
                 "expiry_date must be an ISO 8601 formatted string (e.g., '2024-12-31T23:59:59')"
             )
 
 
+_EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+class VoucherRecipientDetails(VoucherDetails):
+    """Voucher details with the address to email the voucher to, if any."""
+
+    email: Optional[str] = None
+
+    @validator("email")
+    @classmethod
+    def validate_email(cls, value):
+        """Ensure email looks like an address, treating an empty one as none."""
+        value = (value or "").strip()
+        if not value:
+            return None
+        if not _EMAIL_PATTERN.fullmatch(value):
+            raise ValueError("email must be an email address")
+        return value
+
+
+class VoucherBatchRequest(BaseModel):
+    vouchers: list[VoucherDetails] = Field(
+        ..., min_length=1, max_length=config.VOUCHER_BATCH_MAX_SIZE
+    )
+
+
+class VoucherBatchItemResult(BaseModel):
+    index: int
+    voucher_id: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+
+class VoucherImportItemResult(VoucherBatchItemResult):
+    row_key: Optional[str] = None
+
+
+class VoucherImportResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    duplicates: int
+    results: list[VoucherImportItemResult]
+
+
+class VoucherJobRequest(BaseModel):
+    vouchers: list[VoucherRecipientDetails] = Field(
+        ..., min_length=1, max_length=config.JOB_MAX_SIZE
+    )
+    send_emails: bool = False
+
+
+class VoucherJobResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+
+
 class ClaimVoucherRequest(BaseModel):
     voucher_id: str
 
 
+class ClaimVoucherBatchRequest(BaseModel):
+    voucher_ids: list[str] = Field(
+        ..., min_length=1, max_length=config.CLAIM_BATCH_MAX_SIZE
+    )
+
+
+class VoucherClaimResult(BaseModel):
+    voucher_id: str
+    result: str
+    detail: Optional[str] = None
+
+
+class ClaimVoucherBatchResponse(BaseModel):
+    results: list[VoucherClaimResult]
+
+
 class GenericResponse(BaseModel):
     message: str
 
 
 class VoucherResponse(BaseModel):
+    # Built straight from Voucher entities, without an intermediate dict.
+    model_config = ConfigDict(from_attributes=True)
+
     voucher_id: str
     first_name: str
     last_name: str
@@ -57,3 +142,4 @@ class VoucherResponse(BaseModel):
 
 class VoucherList(BaseModel):
     vouchers: list[VoucherResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,28 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from core.config import config
+from core.profiling import with_profiling
+
+# boto3, smtplib and requests are blocking, so route handlers run them here
+# instead of on the event loop. The pool is bounded by IO_POOL_SIZE, which also
+# caps the number of concurrent calls made to AWS.
+io_executor = ThreadPoolExecutor(
+    max_workers=config.IO_POOL_SIZE, thread_name_prefix="io"
+)
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking call on the I/O thread pool and awaits its result."""
+    loop = asyncio.get_running_loop()
+    # The context is carried over, as asyncio.to_thread does, so the call can
+    # tell whether its request is being profiled.
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        io_executor, context.run, with_profiling(func, *args, **kwargs)
+    )
+
+
+def shutdown_io_executor():
+    io_executor.shutdown(wait=True)
@@ -0,0 +1,112 @@
+import threading
+from functools import lru_cache
+from core.config import config
+from core.metrics import instrument_boto_client
+
+# Creating clients from one boto3 session is not thread-safe.
+_lock = threading.Lock()
+_clients: dict = {}
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    """
+    Returns the boto3 session every client is created from, so credentials,
+    region and the loaded service models are resolved once per process.
+    """
+    import boto3
+
+    return boto3.session.Session(
+        region_name=config.AWS_REGION,
+        aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+    )
+
+
+def client_config(**overrides):
+    """
+    Returns the botocore settings shared by every client: connection pool
+    size, timeouts, retry mode and TCP keepalive, as set in Config.
+    """
+    from botocore.config import Config as ClientConfig
+
+    settings = {
+        "max_pool_connections": config.AWS_MAX_POOL_CONNECTIONS,
+        "connect_timeout": config.AWS_CONNECT_TIMEOUT,
+        "read_timeout": config.AWS_READ_TIMEOUT,
+        "retries": {
+            "mode": config.AWS_RETRY_MODE,
+            "total_max_attempts": config.AWS_MAX_ATTEMPTS,
+        },
+        "tcp_keepalive": config.AWS_TCP_KEEPALIVE,
+    }
+    settings.update(overrides)
+    return ClientConfig(**settings)
+
+
+def create_client(service_name: str):
+    """Creates an instrumented client for a service from the shared session."""
+    with _lock:
+        client = get_session().client(service_name, config=client_config())
+        _clients[service_name] = client
+    return instrument_boto_client(client)
+
+
+def create_resource(service_name: str):
+    """Creates a resource for a service from the shared session."""
+    with _lock:
+        resource = get_session().resource(service_name, config=client_config())
+        _clients[service_name] = resource.meta.client
+    instrument_boto_client(resource.meta.client)
+    return resource
+
+
+def _pools(client) -> list:
+    # botocore does not expose its urllib3 pools, so this reaches into the
+    # endpoint's session. Anything unexpected just reports no pools.
+    try:
+        manager = client._endpoint.http_session._manager
+        pools = []
+        for key in manager.pools.keys():
+            try:
+                pools.append(manager.pools[key])
+            except KeyError:
+                continue  # Evicted in the meantime.
+        return pools
+    except AttributeError:
+        return []
+
+
+def pool_stats(client) -> dict:
+    """
+    Returns the connection pool usage of a client.
+
+    There is one pool per endpoint host, each holding up to
+    max_pool_connections connections. "saturation" is the share of the
+    busiest pool in use; at 1.0 further calls open extra connections that are
+    closed after use, which shows as "opened" rising with the traffic.
+    """
+    in_use, opened, saturation = 0, 0, 0.0
+    for pool in _pools(client):
+        opened += pool.num_connections
+        if pool.pool is None:
+            continue  # Closed.
+        # The queue holds the idle slots, connected or not.
+        busy = pool.pool.maxsize - pool.pool.qsize()
+        in_use += busy
+        saturation = max(saturation, busy / pool.pool.maxsize)
+    return {
+        "in_use": in_use,
+        "max": client.meta.config.max_pool_connections,
+        "opened": opened,
+        "saturation": saturation,
+    }
+
+
+def connection_pool_stats() -> dict[str, dict]:
+    """Returns the pool_stats of every client created so far, by service."""
+    with _lock:
+        clients = dict(_clients)
+    return {
+        service_name: pool_stats(client) for service_name, client in clients.items()
+    }
@@ -3,32 +3,43 @@ import jwt
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from core.config import config
-import boto3
+from core.metrics import instrumented
+from core.token_cache import token_cache
+from infrastructure.aws import create_client
+from infrastructure.jwks import jwks_store
+from functools import lru_cache
 
 security = HTTPBearer()
-client = boto3.client("cognito-idp", region_name=config.AWS_REGION)
 
 
-def get_cognito_public_keys():
-    response = requests.get(config.COGNITO_KEYS_URL)
-    response.raise_for_status()
-    return {key["kid"]: key for key in response.json()["keys"]}
+@lru_cache(maxsize=None)
+def get_cognito_client():
+    return create_client("cognito-idp")
 
 
-COGNITO_KEYS = get_cognito_public_keys()
+def __getattr__(name: str):
+    # Keeps `from infrastructure.cognito import client` working.
+    if name == "client":
+        return get_cognito_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+@instrumented("verify_token")
 def verify_token(auth: HTTPAuthorizationCredentials = Security(security)):
     token = auth.credentials
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
 
-        if kid not in COGNITO_KEYS:
+        public_key = jwks_store.get_key(kid)
+        if public_key is None:
             raise HTTPException(status_code=401, detail="Invalid token header.")
 
-        public_key = jwt.algorithms.RSAAlgorithm.from_jwk(COGNITO_KEYS[kid])
-
         payload = jwt.decode(
             token,
             public_key,
@@ -45,9 +56,14 @@ def verify_token(auth: HTTPAuthorizationCredentials = Security(security)):
                 detail="You are not authorized to access this resource.",
             )
 
+        token_cache.put(token, payload)
         return payload
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired.")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token.")
+    except requests.RequestException:
+        raise HTTPException(
+            status_code=503, detail="Unable to fetch token signing keys."
+        )
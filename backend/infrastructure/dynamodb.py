@@ -1,11 +1,44 @@
-import boto3
+from functools import lru_cache
 from core.config import config
+from infrastructure.aws import create_resource
 
-dynamodb = boto3.resource(
-    "dynamodb",
-    region_name=config.AWS_REGION,
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-)
 
-table = dynamodb.Table(config.DYNAMODB_TABLE)
+@lru_cache(maxsize=None)
+def get_dynamodb():
+    # boto3 is imported and the resource built on first use, then reused for
+    # the lifetime of the process (or Lambda container).
+    return create_resource("dynamodb")
+
+
+@lru_cache(maxsize=None)
+def get_table():
+    return get_dynamodb().Table(config.DYNAMODB_TABLE)
+
+
+@lru_cache(maxsize=None)
+def get_jobs_table():
+    return get_dynamodb().Table(config.DYNAMODB_JOBS_TABLE)
+
+
+def projection(attributes) -> dict:
+    """
+    Builds the request parameters that limit a read to the given attributes.
+
+    Attribute names are always passed as placeholders, since most voucher
+    attributes are hyphenated. The placeholders do not clash with those
+    generated by boto3's condition builders.
+    """
+    names = {f"#p{index}": attribute for index, attribute in enumerate(attributes)}
+    return {
+        "ProjectionExpression": ", ".join(names),
+        "ExpressionAttributeNames": names,
+    }
+
+
+def __getattr__(name: str):
+    # Keeps `from infrastructure.dynamodb import table` working.
+    if name == "dynamodb":
+        return get_dynamodb()
+    if name == "table":
+        return get_table()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,137 @@
+import json
+import logging
+import queue
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+from core.config import config
+from infrastructure.aws import create_client
+from constants.enums import JobQueueBackend
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_sqs():
+    return create_client("sqs")
+
+
+class InProcessJobQueue:
+    """
+    Runs jobs on background threads of the current process.
+
+    Meant for local development and single-container deployments. Jobs that
+    were queued or interrupted when the process stopped are picked up again by
+    whatever calls enqueue on the next start.
+    """
+
+    def __init__(self, handler: Callable[[str], None]):
+        self._handler = handler
+        self._jobs: queue.Queue = queue.Queue()
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            self._stopping.clear()
+            for index in range(config.JOB_WORKERS):
+                worker = threading.Thread(
+                    target=self._run, name=f"voucher-job-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stops the workers after their current chunk. Jobs still in progress
+        resume from their last checkpoint on the next start.
+        """
+        with self._lock:
+            self._stopping.set()
+            for worker in self._workers:
+                worker.join(timeout)
+            self._workers = []
+
+    def enqueue(self, job_id: str):
+        self.start()
+        self._jobs.put(job_id)
+
+    def should_stop(self) -> bool:
+        return self._stopping.is_set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                job_id = self._jobs.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                self._handler(job_id)
+            except Exception:
+                logger.warning("Voucher job %s failed.", job_id, exc_info=True)
+                if not self._stopping.is_set():
+                    self._retry_later(job_id)
+            finally:
+                self._jobs.task_done()
+
+    def _retry_later(self, job_id: str):
+        # Requeued from a timer rather than at once, so a job leased to
+        # another worker is not retried in a tight loop.
+        timer = threading.Timer(config.JOB_RETRY_DELAY, self._jobs.put, (job_id,))
+        timer.daemon = True
+        timer.start()
+
+
+class SQSJobQueue:
+    """
+    Sends job IDs to SQS, to be processed by the Lambda consuming the queue.
+
+    A job whose invocation fails or times out becomes visible again after the
+    queue's visibility timeout and resumes from its last checkpoint.
+    """
+
+    def __init__(self, handler: Callable[[str], None]):
+        self._handler = handler
+
+    def start(self):
+        pass
+
+    def stop(self, timeout: Optional[float] = None):
+        pass
+
+    def enqueue(self, job_id: str):
+        get_sqs().send_message(
+            QueueUrl=config.JOB_QUEUE_URL, MessageBody=json.dumps({"job_id": job_id})
+        )
+
+    def should_stop(self) -> bool:
+        return False
+
+    def handle_event(self, event: dict) -> dict:
+        """
+        Processes an SQS event delivered to Lambda.
+
+        Returns:
+            dict: The partial batch response, so only failed messages are
+            redelivered.
+        """
+        failures = []
+        for record in event["Records"]:
+            try:
+                self._handler(json.loads(record["body"])["job_id"])
+            except Exception:
+                logger.warning(
+                    "Voucher job message %s failed.", record["messageId"], exc_info=True
+                )
+                failures.append({"itemIdentifier": record["messageId"]})
+        return {"batchItemFailures": failures}
+
+
+def create_job_queue(handler: Callable[[str], None]):
+    if config.JOB_QUEUE_BACKEND == JobQueueBackend.SQS.value:
+        return SQSJobQueue(handler)
+    return InProcessJobQueue(handler)
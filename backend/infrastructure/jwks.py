@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+from typing import Any, Optional
+import jwt
+import requests
+from core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """
+    Caches the Cognito signing keys as parsed public key objects, by `kid`.
+
+    The key set is refetched once JWKS_CACHE_TTL seconds have passed, or when a
+    token names a `kid` that is not cached (key rotation). Refreshes are rate
+    limited by JWKS_MIN_REFRESH_INTERVAL so that forged headers or an outage
+    cannot turn into a fetch per request. Concurrent refreshes collapse
+    into a single fetch, and if the endpoint is down the last known keys keep
+    being served.
+    """
+
+    def __init__(self, url: str, ttl: int = config.JWKS_CACHE_TTL):
+        self._url = url
+        self._ttl = ttl
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        now = time.monotonic()
+        stale = now - self._fetched_at >= self._ttl or kid not in self._keys
+        throttled = now - self._attempted_at < config.JWKS_MIN_REFRESH_INTERVAL
+        if not self._keys or (stale and not throttled):
+            self.refresh(seen_attempt=self._attempted_at)
+
+        return self._keys.get(kid)
+
+    def refresh(self, seen_attempt: Optional[float] = None):
+        """
+        Fetches and parses the key set.
+
+        Args:
+            seen_attempt (Optional[float]): The refresh attempt the caller based
+                its decision on. If another thread has refreshed since, this
+                call returns without fetching again.
+        """
+        with self._lock:
+            if seen_attempt is not None and self._attempted_at != seen_attempt:
+                return
+
+            try:
+                response = requests.get(self._url, timeout=config.JWKS_TIMEOUT)
+                response.raise_for_status()
+                keys = {
+                    key["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(key)
+                    for key in response.json()["keys"]
+                }
+            except Exception:
+                self._attempted_at = time.monotonic()
+                if not self._keys:
+                    raise
+                logger.warning(
+                    "Failed to refresh JWKS, serving cached keys.", exc_info=True
+                )
+                return
+
+            self._keys = keys
+            self._fetched_at = self._attempted_at = time.monotonic()
+
+
+jwks_store = JWKSKeyStore(config.COGNITO_KEYS_URL)
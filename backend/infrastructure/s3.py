@@ -1,13 +1,23 @@
-import boto3
-import botocore
+import hashlib
+import uuid
+import botocore.exceptions
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
 from core.config import config
+from infrastructure.aws import create_client
 
-s3 = boto3.client(
-    "s3",
-    region_name=config.AWS_REGION,
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-)
+
+@lru_cache(maxsize=None)
+def get_s3():
+    return create_client("s3")
+
+
+def __getattr__(name: str):
+    # Keeps `from infrastructure.s3 import s3` working.
+    if name == "s3":
+        return get_s3()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def retrieve_template(template_name: str = "voucher-atletika.jpg") -> bytes:
@@ -24,6 +34,7 @@ def retrieve_template(template_name: str = "voucher-atletika.jpg") -> bytes:
         Exception: If the file is not found or there's an S3 error.
     """
     directory = f"templates/{template_name}"
+    s3 = get_s3()
 
     try:
         response = s3.get_object(Bucket=config.S3_BUCKET, Key=directory)
@@ -40,3 +51,200 @@ def retrieve_template(template_name: str = "voucher-atletika.jpg") -> bytes:
 
     except Exception as e:
         raise Exception(f"Unexpected error retrieving file from S3: {str(e)}")
+
+
+def retrieve_template_if_modified(
+    template_name: str, etag: Optional[str] = None
+) -> tuple[Optional[bytes], str]:
+    """
+    Retrieves a template from S3 unless it still matches a known ETag.
+
+    Args:
+        template_name (str): The name of the template file.
+        etag (Optional[str]): The ETag of the copy the caller already holds.
+
+    Returns:
+        tuple[Optional[bytes], str]: The binary content of the file, or None if
+        it has not changed, together with its current ETag.
+
+    Raises:
+        Exception: If the file is not found or there's an S3 error.
+    """
+    directory = f"templates/{template_name}"
+    s3 = get_s3()
+    request = {"Bucket": config.S3_BUCKET, "Key": directory}
+    if etag:
+        request["IfNoneMatch"] = etag
+
+    try:
+        response = s3.get_object(**request)
+        return response["Body"].read(), response["ETag"]
+
+    except s3.exceptions.NoSuchKey:
+        raise FileNotFoundError(f"Template '{template_name}' not found in S3 bucket.")
+
+    except botocore.exceptions.ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        if error_code in ("304", "NotModified"):
+            return None, etag
+        raise Exception(
+            f"S3 ClientError: {error_code} - {e.response['Error']['Message']}"
+        )
+
+    except Exception as e:
+        raise Exception(f"Unexpected error retrieving file from S3: {str(e)}")
+
+
+def retrieve_template_etag(template_name: str) -> str:
+    """
+    Returns the current ETag of a template with a HEAD request, without
+    downloading it.
+
+    Raises:
+        Exception: If the file is not found or there's an S3 error.
+    """
+    try:
+        response = get_s3().head_object(
+            Bucket=config.S3_BUCKET, Key=f"templates/{template_name}"
+        )
+        return response["ETag"]
+
+    except botocore.exceptions.ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        if error_code in ("404", "NoSuchKey"):
+            raise FileNotFoundError(
+                f"Template '{template_name}' not found in S3 bucket."
+            )
+        raise Exception(
+            f"S3 ClientError: {error_code} - {e.response['Error']['Message']}"
+        )
+
+
+def store_voucher_pdf(pdf: bytes) -> str:
+    """
+    Stores a rendered voucher PDF under a content-addressed key.
+
+    Args:
+        pdf (bytes): The rendered PDF.
+
+    Returns:
+        str: The S3 key, derived from the SHA-256 of the content.
+    """
+    key = f"{config.VOUCHER_PDF_PREFIX}{hashlib.sha256(pdf).hexdigest()}.pdf"
+    get_s3().put_object(
+        Bucket=config.S3_BUCKET, Key=key, Body=pdf, ContentType="application/pdf"
+    )
+    return key
+
+
+def open_voucher_pdf(key: str):
+    """
+    Opens a stored voucher PDF for streaming.
+
+    Args:
+        key (str): The S3 key returned by store_voucher_pdf.
+
+    Returns:
+        botocore.response.StreamingBody: The object body.
+
+    Raises:
+        FileNotFoundError: If the object does not exist.
+    """
+    s3 = get_s3()
+
+    try:
+        return s3.get_object(Bucket=config.S3_BUCKET, Key=key)["Body"]
+
+    except s3.exceptions.NoSuchKey:
+        raise FileNotFoundError(f"Voucher PDF '{key}' not found in S3 bucket.")
+
+
+def job_key(job_id: str, name: str) -> str:
+    return f"{config.JOBS_PREFIX}{job_id}/{name}"
+
+
+def store_job_object(job_id: str, name: str, body, content_type: str) -> str:
+    """
+    Stores a job's payload, checkpoint or bundle.
+
+    Args:
+        job_id (str): The job ID.
+        name (str): The object name within the job's prefix.
+        body (bytes | file-like): The content. File-like bodies are uploaded in
+            parts, so large bundles are never held in memory at once.
+        content_type (str): The content type.
+
+    Returns:
+        str: The S3 key.
+    """
+    key = job_key(job_id, name)
+    if isinstance(body, bytes):
+        get_s3().put_object(
+            Bucket=config.S3_BUCKET, Key=key, Body=body, ContentType=content_type
+        )
+    else:
+        get_s3().upload_fileobj(
+            body, config.S3_BUCKET, key, ExtraArgs={"ContentType": content_type}
+        )
+    return key
+
+
+def open_job_object(key: str):
+    """
+    Opens a stored job object for reading.
+
+    Raises:
+        FileNotFoundError: If the object does not exist.
+    """
+    s3 = get_s3()
+
+    try:
+        return s3.get_object(Bucket=config.S3_BUCKET, Key=key)["Body"]
+
+    except s3.exceptions.NoSuchKey:
+        raise FileNotFoundError(f"Job object '{key}' not found in S3 bucket.")
+
+
+def delete_job_objects(keys: list[str]):
+    for start in range(0, len(keys), 1000):
+        get_s3().delete_objects(
+            Bucket=config.S3_BUCKET,
+            Delete={"Objects": [{"Key": key} for key in keys[start : start + 1000]]},
+        )
+
+
+def store_voucher_archive(body: bytes) -> str:
+    """
+    Stores a batch of archived vouchers.
+
+    Args:
+        body (bytes): Gzip-compressed NDJSON, one voucher item per line.
+
+    Returns:
+        str: The S3 key, partitioned by the day the batch was archived.
+    """
+    now = datetime.now(timezone.utc)
+    key = (
+        f"{config.VOUCHER_ARCHIVE_PREFIX}{now:%Y/%m/%d}/"
+        f"{now:%H%M%S}-{uuid.uuid4().hex}.ndjson.gz"
+    )
+    get_s3().put_object(
+        Bucket=config.S3_BUCKET,
+        Key=key,
+        Body=body,
+        ContentType="application/x-ndjson",
+        ContentEncoding="gzip",
+    )
+    return key
+
+
+def presign_download(key: str, filename: str = "Atletika_Voucher.pdf") -> str:
+    return get_s3().generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": config.S3_BUCKET,
+            "Key": key,
+            "ResponseContentDisposition": f"attachment; filename={filename}",
+        },
+        ExpiresIn=config.PRESIGNED_URL_TTL,
+    )
@@ -0,0 +1,88 @@
+import queue
+import smtplib
+import threading
+from contextlib import contextmanager
+from core.config import config
+from core.metrics import instrumented
+
+
+class SMTPConnectionPool:
+    """
+    A bounded pool of authenticated SMTP connections.
+
+    Connections are opened lazily, kept open between messages and checked with
+    NOOP before reuse, so the STARTTLS and login handshake is paid once per
+    connection rather than once per email.
+    """
+
+    def __init__(self, size: int = config.SMTP_POOL_SIZE):
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @instrumented("smtp.connect")
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(
+            config.SMTP_HOST, config.SMTP_PORT, timeout=config.SMTP_TIMEOUT
+        )
+        try:
+            if config.SMTP_USE_TLS:
+                server.starttls()
+            if config.EMAIL_APP_PASSWORD:
+                server.login(config.EMAIL_ADDRESS, config.EMAIL_APP_PASSWORD)
+        except Exception:
+            _close(server)
+            raise
+        return server
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            _close(server)
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of the block.
+
+        The connection is returned to the pool on success and discarded if the
+        block raises, since its session state is then unknown.
+        """
+        self._slots.acquire()
+        try:
+            server = self._checkout()
+            try:
+                yield server
+            except Exception:
+                _close(server)
+                raise
+            self._idle.put(server)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                _close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _close(server: smtplib.SMTP):
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+smtp_pool = SMTPConnectionPool()
@@ -1,7 +1,20 @@
 from fastapi import FastAPI
 from mangum import Mangum
-from api import auth, vouchers
+from api import auth, jobs, metrics, vouchers
 from fastapi.middleware.cors import CORSMiddleware
+from core.config import config
+from constants.enums import JobQueueBackend
+from core.executors import shutdown_render_pool, start_render_workers
+from core.metrics import MetricsMiddleware, metrics as metrics_registry
+from core.profiling import ProfilingMiddleware
+from infrastructure.aio import shutdown_io_executor
+from services.email_delivery import email_queue
+from services.job_service import job_queue, resume_pending_jobs
+from services.lifecycle_service import (
+    normalize_expiry_dates,
+    sweep_expired_vouchers,
+    sweeper,
+)
 
 app = FastAPI()
 
@@ -13,8 +26,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routes
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(vouchers.router, prefix="/vouchers", tags=["Vouchers"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+if config.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+
+
+@app.on_event("startup")
+def startup():
+    if config.PRELOAD_TEMPLATES:
+        start_render_workers()
+    email_queue.start()
+    job_queue.start()
+    if config.JOB_QUEUE_BACKEND == JobQueueBackend.INPROCESS.value:
+        resume_pending_jobs()
+    sweeper.start()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    sweeper.stop()
+    job_queue.stop()
+    email_queue.stop()
+    shutdown_render_pool()
+    shutdown_io_executor()
+
+
+# Mangum would run the startup and shutdown hooks around every invocation,
+# shutting down the shared executors after the first request of a warm
+# container. Nothing else in them is needed on Lambda: the render pool and
+# the clients are created on first use, and emails are sent synchronously.
+asgi_handler = Mangum(app, lifespan="off")
+
 
-handler = Mangum(app)
+def handler(event, context):
+    # Generation jobs are delivered to the same function through SQS, and the
+    # expired-voucher sweep is triggered by an EventBridge schedule. The
+    # one-off expiry date backfill is invoked directly with
+    # {"action": "normalize-expiry-dates"}.
+    records = event.get("Records") or [{}]
+    try:
+        if records[0].get("eventSource") == "aws:sqs":
+            return job_queue.handle_event(event)
+        if event.get("action") == "normalize-expiry-dates":
+            return normalize_expiry_dates()
+        if event.get("detail-type") == "Scheduled Event":
+            return sweep_expired_vouchers()
+        return asgi_handler(event, context)
+    finally:
+        if config.METRICS_EMF:
+            for line in metrics_registry.flush_emf():
+                print(line)
@@ -1,9 +1,11 @@
-from infrastructure.cognito import client
+from infrastructure.cognito import get_cognito_client
 from core.config import config
+from core.token_cache import token_cache
 from domain.models import LoginRequest, LoginResponse, LogoutRequest, GenericResponse
 import hmac
 import hashlib
 import base64
+import jwt
 from fastapi import HTTPException
 from botocore.exceptions import ClientError, BotoCoreError
 
@@ -19,6 +21,7 @@ def calculate_secret_hash(username: str) -> str:
 
 
 def login(request: LoginRequest) -> LoginResponse:
+    client = get_cognito_client()
     try:
         secret_hash = calculate_secret_hash(request.email)
         response = client.initiate_auth(
@@ -57,8 +60,20 @@ def login(request: LoginRequest) -> LoginResponse:
 
 
 def logout(request: LogoutRequest) -> GenericResponse:
+    client = get_cognito_client()
     try:
         response = client.global_sign_out(AccessToken=request.access_token)
+
+        # Global sign-out revokes every token of the user, not just this one.
+        token_cache.invalidate(request.access_token)
+        try:
+            claims = jwt.decode(
+                request.access_token, options={"verify_signature": False}
+            )
+            token_cache.invalidate_subject(claims["sub"])
+        except (jwt.InvalidTokenError, KeyError):
+            pass
+
         return GenericResponse(message="User logged out successful.")
 
     except client.exceptions.NotAuthorizedException as nae:
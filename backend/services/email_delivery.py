@@ -0,0 +1,191 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from fastapi import HTTPException
+from core.config import config
+from core.metrics import timed
+from infrastructure.smtp import smtp_pool
+from utils.send_email import build_email, send_email, serialize_email
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmailJob:
+    email: str
+    pdf_data: bytes
+    filename: str = "Atletika_Voucher.pdf"
+    attempts: int = 0
+
+
+class EmailDeliveryQueue:
+    """
+    Delivers voucher emails from a bounded queue on background worker threads.
+
+    Each worker drains up to EMAIL_BATCH_SIZE jobs at a time and sends them over
+    a single pooled SMTP connection. Failed jobs are retried with exponential
+    backoff up to EMAIL_MAX_RETRIES times before being dropped and logged.
+    """
+
+    def __init__(self):
+        self._jobs: queue.Queue = queue.Queue(maxsize=config.EMAIL_QUEUE_SIZE)
+        self._workers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            self._stopping.clear()
+            for index in range(config.EMAIL_WORKERS):
+                worker = threading.Thread(
+                    target=self._run, name=f"email-delivery-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout: float = config.EMAIL_DRAIN_TIMEOUT):
+        """
+        Waits up to timeout seconds for queued emails to be delivered, then
+        stops the workers. Emails still queued or waiting for a retry by then
+        are dropped and logged, so an unreachable SMTP server cannot hold up
+        shutdown.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            if not self._workers:
+                return
+            self._drain(deadline)
+            self._stopping.set()
+
+            dropped = 0
+            while True:
+                try:
+                    self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                self._jobs.task_done()
+                dropped += 1
+            if dropped:
+                logger.error("Dropped %d queued emails on shutdown.", dropped)
+
+            # A send in progress can still take up to SMTP_TIMEOUT; the
+            # workers are daemon threads and are not waited for beyond this.
+            for worker in self._workers:
+                worker.join(max(deadline - time.monotonic(), 0))
+            self._workers = []
+        smtp_pool.close()
+
+    def _drain(self, deadline: float):
+        # queue.Queue.join has no timeout, so this waits on its condition.
+        with self._jobs.all_tasks_done:
+            while self._jobs.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._jobs.all_tasks_done.wait(remaining)
+
+    def enqueue(self, job: EmailJob):
+        self.start()
+        try:
+            self._jobs.put(job, timeout=config.EMAIL_ENQUEUE_TIMEOUT)
+        except queue.Full:
+            raise HTTPException(status_code=503, detail="Email delivery queue is full.")
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def _next_batch(self) -> list[EmailJob]:
+        try:
+            batch = [self._jobs.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < config.EMAIL_BATCH_SIZE:
+            try:
+                batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            try:
+                self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self._jobs.task_done()
+
+    def _deliver(self, batch: list[EmailJob]):
+        while batch:
+            failed = []
+            try:
+                with smtp_pool.connection() as server:
+                    for index, job in enumerate(batch):
+                        try:
+                            msg = build_email(job.email, job.pdf_data, job.filename)
+                            with timed("smtp.send"):
+                                server.sendmail(
+                                    msg["From"], msg["To"], serialize_email(msg)
+                                )
+                        except smtplib.SMTPServerDisconnected:
+                            failed.extend(batch[index:])
+                            raise
+                        except Exception:
+                            logger.warning(
+                                "Email delivery to %s failed.", job.email, exc_info=True
+                            )
+                            failed.append(job)
+            except Exception:
+                if not failed:
+                    # The connection could not be opened at all.
+                    failed = batch
+
+            batch = self._retryable(failed)
+            if batch:
+                attempts = max(job.attempts for job in batch)
+                backoff = config.EMAIL_RETRY_BACKOFF * 2 ** (attempts - 1)
+                if self._stopping.wait(backoff):
+                    logger.error(
+                        "Dropped %d emails awaiting a retry on shutdown.", len(batch)
+                    )
+                    return
+
+    def _retryable(self, failed: list[EmailJob]) -> list[EmailJob]:
+        retry = []
+        for job in failed:
+            job.attempts += 1
+            if job.attempts > config.EMAIL_MAX_RETRIES:
+                logger.error(
+                    "Giving up on email to %s after %d attempts.",
+                    job.email,
+                    job.attempts,
+                )
+            else:
+                retry.append(job)
+        return retry
+
+
+email_queue = EmailDeliveryQueue()
+
+
+def deliver_voucher_email(
+    email: str, pdf_data: bytes, filename: str = "Atletika_Voucher.pdf"
+):
+    """
+    Sends a voucher email, through the background queue unless
+    EMAIL_ASYNC_DELIVERY is disabled (e.g. on Lambda, where threads are frozen
+    between invocations).
+    """
+    if config.EMAIL_ASYNC_DELIVERY:
+        email_queue.enqueue(EmailJob(email=email, pdf_data=pdf_data, filename=filename))
+    else:
+        send_email(email, pdf_data, filename)
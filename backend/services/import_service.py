@@ -0,0 +1,211 @@
+import codecs
+import csv
+import logging
+import uuid
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+from pydantic import ValidationError
+from domain.models import (
+    VoucherImportItemResult,
+    VoucherImportResponse,
+    VoucherRecipientDetails,
+)
+from services.voucher_service import (
+    email_vouchers,
+    existing_voucher_ids,
+    issue_vouchers,
+)
+from core.config import config
+from core.metrics import instrumented, metrics
+from constants.enums import BatchItemStatus
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = ("first_name", "last_name", "expiry_date", "percentage")
+ROW_KEY_COLUMN = "row_key"
+EMAIL_COLUMN = "email"
+
+# Rows with a row key are issued under an ID derived from it, so importing the
+# same row again finds the voucher instead of issuing a second one.
+IMPORT_NAMESPACE = uuid.UUID("2fede7ff-f5c2-416e-9104-385f964b4d38")
+
+
+def _read_rows(csv_file: BinaryIO) -> Iterator[dict]:
+    """
+    Yields the rows of an uploaded CSV as dicts, one at a time.
+
+    Column names are matched case-insensitively and a UTF-8 byte order mark,
+    as written by Excel, is skipped.
+
+    Raises:
+        ValueError: If a required column is missing or the file is not a
+            valid UTF-8 CSV.
+    """
+    # Decoded line by line instead of through TextIOWrapper, which needs
+    # readable(): upload spool files only have it from Python 3.11. csv joins
+    # quoted fields that span lines again.
+    reader = csv.DictReader(codecs.iterdecode(csv_file, "utf-8-sig"))
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [column for column in IMPORT_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"CSV is missing the columns: {', '.join(missing)}.")
+
+    try:
+        yield from reader
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV on line {reader.line_num}: {e}")
+
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def _import_chunk(
+    rows: list[tuple[int, dict]], seen: set[str], send_emails: bool
+) -> list[VoucherImportItemResult]:
+    """
+    Validates a chunk of rows and issues the valid ones that were not imported
+    before, rendering them in parallel and writing them in one batch.
+    """
+    results: dict[int, VoucherImportItemResult] = {}
+    candidates: list[tuple[int, Optional[str], str, VoucherRecipientDetails]] = []
+
+    for index, row in rows:
+        row_key = (row.get(ROW_KEY_COLUMN) or "").strip() or None
+        try:
+            details = VoucherRecipientDetails.model_validate(
+                {column: row.get(column) for column in (*IMPORT_COLUMNS, EMAIL_COLUMN)}
+            )
+        except ValidationError as e:
+            results[index] = VoucherImportItemResult(
+                index=index,
+                row_key=row_key,
+                status=BatchItemStatus.FAILED.value,
+                error=_validation_error(e),
+            )
+            continue
+
+        if row_key is None:
+            candidates.append((index, None, str(uuid.uuid4()), details))
+            continue
+
+        voucher_id = str(uuid.uuid5(IMPORT_NAMESPACE, row_key))
+        if voucher_id in seen:
+            # Repeated further up in the same file.
+            results[index] = VoucherImportItemResult(
+                index=index,
+                row_key=row_key,
+                voucher_id=voucher_id,
+                status=BatchItemStatus.DUPLICATE.value,
+            )
+            continue
+        seen.add(voucher_id)
+        candidates.append((index, row_key, voucher_id, details))
+
+    existing = existing_voucher_ids(
+        [voucher_id for _, row_key, voucher_id, _ in candidates if row_key]
+    )
+    to_issue = []
+    for index, row_key, voucher_id, details in candidates:
+        if voucher_id in existing:
+            results[index] = VoucherImportItemResult(
+                index=index,
+                row_key=row_key,
+                voucher_id=voucher_id,
+                status=BatchItemStatus.DUPLICATE.value,
+            )
+        else:
+            to_issue.append((index, row_key, voucher_id, details))
+
+    if to_issue:
+        unique_ids = [voucher_id for _, _, voucher_id, _ in to_issue]
+        vouchers = [details for _, _, _, details in to_issue]
+        rendered, issued = issue_vouchers(unique_ids, vouchers)
+        for (index, row_key, voucher_id, _), result in zip(to_issue, issued):
+            if result.voucher_id is None:
+                # Not issued, so a later row with the same key may try again.
+                seen.discard(voucher_id)
+            results[index] = VoucherImportItemResult(
+                **result.model_dump(exclude={"index"}), index=index, row_key=row_key
+            )
+        if send_emails:
+            email_vouchers(unique_ids, vouchers, rendered)
+
+    return [results[index] for index, _ in rows]
+
+
+def _over_limit(rows: list[tuple[int, dict]]) -> list[VoucherImportItemResult]:
+    error = (
+        f"Imports are limited to {config.IMPORT_MAX_ROWS} rows, "
+        "use a voucher job for larger campaigns."
+    )
+    return [
+        VoucherImportItemResult(
+            index=index,
+            row_key=(row.get(ROW_KEY_COLUMN) or "").strip() or None,
+            status=BatchItemStatus.FAILED.value,
+            error=error,
+        )
+        for index, row in rows
+    ]
+
+
+@instrumented("voucher_import")
+def import_vouchers(
+    csv_file: BinaryIO, send_emails: bool = False
+) -> VoucherImportResponse:
+    """
+    Issues a voucher for every row of a CSV with the columns first_name,
+    last_name, expiry_date and percentage, and the optional columns row_key
+    and email.
+
+    The file is read and processed IMPORT_CHUNK_SIZE rows at a time, so only
+    one chunk of rows and renders is held in memory. Rows with a row_key are
+    idempotent: a row whose key was imported before, or that repeats a key
+    further up in the file, is reported as a duplicate and not issued or
+    emailed again. Rows past IMPORT_MAX_ROWS are reported as failed.
+
+    Args:
+        csv_file (BinaryIO): The uploaded CSV.
+        send_emails (bool): Whether to email the issued vouchers to the
+            addresses in the email column. Rows without one are not emailed.
+
+    Returns:
+        VoucherImportResponse: The counts and a per-row report in file order,
+        indexed from the first row after the header.
+
+    Raises:
+        ValueError: If the CSV lacks a required column or cannot be parsed.
+            Chunks before the faulty line have been imported by then.
+    """
+    rows = enumerate(_read_rows(csv_file))
+    seen: set[str] = set()
+    results: list[VoucherImportItemResult] = []
+
+    while chunk := list(islice(rows, config.IMPORT_CHUNK_SIZE)):
+        allowed = max(config.IMPORT_MAX_ROWS - chunk[0][0], 0)
+        if allowed:
+            results.extend(_import_chunk(chunk[:allowed], seen, send_emails))
+        results.extend(_over_limit(chunk[allowed:]))
+
+    counts = {status: 0 for status in BatchItemStatus}
+    for result in results:
+        counts[BatchItemStatus(result.status)] += 1
+
+    metrics.increment("vouchers_imported_total", value=counts[BatchItemStatus.SUCCESS])
+    logger.info(
+        "Voucher import issued %d, skipped %d duplicates and failed %d rows.",
+        counts[BatchItemStatus.SUCCESS],
+        counts[BatchItemStatus.DUPLICATE],
+        counts[BatchItemStatus.FAILED],
+    )
+    return VoucherImportResponse(
+        total=len(results),
+        succeeded=counts[BatchItemStatus.SUCCESS],
+        failed=counts[BatchItemStatus.FAILED],
+        duplicates=counts[BatchItemStatus.DUPLICATE],
+        results=results,
+    )
@@ -0,0 +1,421 @@
+import json
+import logging
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from domain.models import VoucherJobResponse, VoucherRecipientDetails
+from infrastructure.dynamodb import get_jobs_table
+from infrastructure.job_queue import create_job_queue
+from infrastructure.s3 import (
+    delete_job_objects,
+    job_key,
+    open_job_object,
+    store_job_object,
+)
+from services.voucher_service import (
+    email_vouchers,
+    existing_voucher_ids,
+    issue_vouchers,
+)
+from core.config import config
+from constants.enums import JobStatus
+
+_deserializer = TypeDeserializer()
+logger = logging.getLogger(__name__)
+
+_LEASE_NAMES = {"#lease_owner": "lease-owner", "#lease_expires": "lease-expires"}
+
+
+class JobLeased(Exception):
+    """Raised when a job is running under another worker's lease."""
+
+
+def _chunk_name(start: int) -> str:
+    return f"chunks/{start:08d}.zip"
+
+
+def _job_response(item: dict) -> VoucherJobResponse:
+    return VoucherJobResponse(
+        job_id=item["job-id"],
+        status=item["status"],
+        total=int(item["total"]),
+        processed=int(item["processed"]),
+        succeeded=int(item["succeeded"]),
+        failed=int(item["failed"]),
+        created_at=item["created-at"],
+        updated_at=item["updated-at"],
+        error=item.get("error"),
+    )
+
+
+def submit_job(
+    vouchers: list[VoucherRecipientDetails], send_emails: bool = False
+) -> VoucherJobResponse:
+    """
+    Persists a generation job and queues it for processing.
+
+    The vouchers are stored in S3, since a large campaign does not fit in a
+    DynamoDB item. The job item holds the progress checkpoint.
+    """
+    job_id = str(uuid.uuid4())
+    payload_key = store_job_object(
+        job_id,
+        "request.json",
+        json.dumps([voucher.model_dump() for voucher in vouchers]).encode(),
+        "application/json",
+    )
+
+    now = datetime.now().isoformat()
+    job = {
+        "job-id": job_id,
+        "status": JobStatus.QUEUED.value,
+        "payload-key": payload_key,
+        "send-emails": send_emails,
+        "chunk-size": config.JOB_CHUNK_SIZE,
+        "total": len(vouchers),
+        "processed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "attempts": 0,
+        "created-at": now,
+        "updated-at": now,
+    }
+    get_jobs_table().put_item(Item=job)
+    job_queue.enqueue(job_id)
+
+    return _job_response(job)
+
+
+def get_job(job_id: str) -> VoucherJobResponse:
+    job = get_jobs_table().get_item(Key={"job-id": job_id}).get("Item")
+    if not job:
+        raise ValueError("Job not found.")
+    return _job_response(job)
+
+
+def get_job_bundle_key(job_id: str) -> str:
+    """
+    Returns the S3 key of a completed job's ZIP bundle.
+
+    Raises:
+        ValueError: If the job does not exist.
+        HTTPException: If the job has not completed.
+    """
+    job = get_jobs_table().get_item(Key={"job-id": job_id}).get("Item")
+    if not job:
+        raise ValueError("Job not found.")
+    if job["status"] != JobStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job['status']}, not completed."
+        )
+    return job["bundle-key"]
+
+
+def _lease_expiry() -> int:
+    return int(time.time()) + config.JOB_LEASE_SECONDS
+
+
+def _claim_job(job_id: str, lease: str):
+    """
+    Leases a queued job, or a running one whose lease has lapsed or was
+    released, to the calling worker.
+
+    Returns:
+        Optional[dict]: The job, or None if it does not exist or is done.
+
+    Raises:
+        JobLeased: If another worker holds a live lease on the job.
+    """
+    try:
+        return get_jobs_table().update_item(
+            Key={"job-id": job_id},
+            UpdateExpression="SET #status = :running, #updated_at = :now, "
+            "#lease_owner = :lease, #lease_expires = :lease_expires "
+            "ADD #attempts :one",
+            ConditionExpression="#status = :queued OR (#status = :running AND "
+            "(attribute_not_exists(#lease_expires) OR #lease_expires < :epoch))",
+            ExpressionAttributeNames={
+                "#status": "status",
+                "#updated_at": "updated-at",
+                "#attempts": "attempts",
+                **_LEASE_NAMES,
+            },
+            ExpressionAttributeValues={
+                ":running": JobStatus.RUNNING.value,
+                ":queued": JobStatus.QUEUED.value,
+                ":now": datetime.now().isoformat(),
+                ":lease": lease,
+                ":lease_expires": _lease_expiry(),
+                ":epoch": int(time.time()),
+                ":one": 1,
+            },
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )["Attributes"]
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        # Returned in the low-level format, the table resource only
+        # deserializes successful responses.
+        job = {
+            key: _deserializer.deserialize(value)
+            for key, value in e.response.get("Item", {}).items()
+        }
+        if job.get("status") == JobStatus.RUNNING.value:
+            raise JobLeased(
+                f"Job {job_id} is leased to another worker until "
+                f"{datetime.fromtimestamp(int(job['lease-expires'])).isoformat()}."
+            )
+        return None
+
+
+def _set_status(job_id: str, lease: str, status: JobStatus, **attributes):
+    """
+    Sets the status of a job and releases its lease, if still held.
+
+    Returns:
+        bool: False if the lease was lost to another worker.
+    """
+    names = {"#status": "status", "#updated_at": "updated-at", **_LEASE_NAMES}
+    values = {
+        ":status": status.value,
+        ":now": datetime.now().isoformat(),
+        ":lease": lease,
+    }
+    assignments = ["#status = :status", "#updated_at = :now"]
+    for index, (name, value) in enumerate(attributes.items()):
+        names[f"#a{index}"] = name
+        values[f":a{index}"] = value
+        assignments.append(f"#a{index} = :a{index}")
+
+    try:
+        get_jobs_table().update_item(
+            Key={"job-id": job_id},
+            UpdateExpression="SET "
+            + ", ".join(assignments)
+            + " REMOVE #lease_owner, #lease_expires",
+            ConditionExpression="#lease_owner = :lease",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        logger.warning("Voucher job %s lost its lease to another worker.", job_id)
+        return False
+
+
+def _checkpoint(
+    job_id: str, lease: str, start: int, end: int, succeeded: int, failed: int
+):
+    """
+    Advances the job past a processed chunk and renews its lease.
+
+    Returns:
+        bool: False if another worker took over or already advanced the job.
+    """
+    try:
+        get_jobs_table().update_item(
+            Key={"job-id": job_id},
+            UpdateExpression="SET #processed = :end, #updated_at = :now, "
+            "#lease_expires = :lease_expires "
+            "ADD #succeeded :succeeded, #failed :failed",
+            ConditionExpression="#processed = :start AND #lease_owner = :lease",
+            ExpressionAttributeNames={
+                "#processed": "processed",
+                "#updated_at": "updated-at",
+                "#succeeded": "succeeded",
+                "#failed": "failed",
+                **_LEASE_NAMES,
+            },
+            ExpressionAttributeValues={
+                ":start": start,
+                ":end": end,
+                ":now": datetime.now().isoformat(),
+                ":lease": lease,
+                ":lease_expires": _lease_expiry(),
+                ":succeeded": succeeded,
+                ":failed": failed,
+            },
+        )
+        return True
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+def _process_chunk(
+    job_id: str,
+    vouchers: list[VoucherRecipientDetails],
+    start: int,
+    send_emails: bool,
+) -> tuple[int, int]:
+    # IDs are derived from the job and the row, so a chunk that is processed
+    # again after an interruption finds the vouchers it already issued. Those
+    # are left as they are, since they may have been claimed since, and are
+    # not emailed again.
+    namespace = uuid.UUID(job_id)
+    unique_ids = [
+        str(uuid.uuid5(namespace, str(index)))
+        for index in range(start, start + len(vouchers))
+    ]
+    existing = existing_voucher_ids(unique_ids)
+    rendered, results = issue_vouchers(unique_ids, vouchers, start, existing)
+
+    if send_emails:
+        issued = [
+            index
+            for index, unique_id in enumerate(unique_ids)
+            if unique_id not in existing
+        ]
+        email_vouchers(
+            [unique_ids[index] for index in issued],
+            [vouchers[index] for index in issued],
+            [rendered[index] for index in issued],
+        )
+
+    archive_data = BytesIO()
+    with zipfile.ZipFile(archive_data, "w") as archive:
+        for unique_id, pdf in zip(unique_ids, rendered):
+            if pdf is not None:
+                archive.writestr(f"{unique_id}.pdf", pdf)
+        archive.writestr(
+            "results.json", json.dumps([result.model_dump() for result in results])
+        )
+    store_job_object(
+        job_id, _chunk_name(start), archive_data.getvalue(), "application/zip"
+    )
+
+    succeeded = sum(1 for result in results if result.voucher_id is not None)
+    return succeeded, len(results) - succeeded
+
+
+def _build_bundle(job_id: str, total: int, chunk_size: int) -> str:
+    chunk_keys = [
+        job_key(job_id, _chunk_name(start)) for start in range(0, total, chunk_size)
+    ]
+    results = []
+
+    with tempfile.TemporaryFile() as bundle:
+        with zipfile.ZipFile(bundle, "w") as archive:
+            for key in chunk_keys:
+                with zipfile.ZipFile(BytesIO(open_job_object(key).read())) as chunk:
+                    for info in chunk.infolist():
+                        if info.filename == "results.json":
+                            results.extend(json.loads(chunk.read(info)))
+                        else:
+                            archive.writestr(info, chunk.read(info))
+            archive.writestr("report.json", json.dumps(results))
+
+        bundle.seek(0)
+        bundle_key = store_job_object(job_id, "bundle.zip", bundle, "application/zip")
+
+    try:
+        delete_job_objects(chunk_keys)
+    except Exception:
+        logger.warning("Failed to clean up chunks of job %s.", job_id, exc_info=True)
+    return bundle_key
+
+
+def process_job(job_id: str):
+    """
+    Processes a generation job from its last checkpoint.
+
+    Vouchers are issued JOB_CHUNK_SIZE at a time and the job item is advanced
+    after every chunk, so an interrupted job (a restart, a Lambda timeout)
+    only repeats the chunk it was working on. Vouchers the interrupted attempt
+    already issued are neither rewritten nor emailed again. Once every chunk
+    is done the per-chunk archives are combined into a single ZIP bundle.
+
+    The job is leased to this call for JOB_LEASE_SECONDS, renewed after every
+    chunk, so a duplicate delivery of the job does not process it alongside.
+    A worker that lost its lease stops at its next checkpoint.
+
+    Raises:
+        JobLeased: If another worker holds the job, so the queue backend
+            retries it once the lease may have lapsed.
+        Exception: If the attempt fails and the job has attempts left, so the
+            queue backend retries it.
+    """
+    lease = str(uuid.uuid4())
+    job = _claim_job(job_id, lease)
+    if job is None:
+        # Unknown, or already completed or failed.
+        return
+
+    try:
+        total = int(job["total"])
+        chunk_size = int(job["chunk-size"])
+        processed = int(job["processed"])
+
+        if processed < total:
+            payload = json.loads(open_job_object(job["payload-key"]).read())
+
+        while processed < total:
+            if job_queue.should_stop():
+                _set_status(job_id, lease, JobStatus.QUEUED)
+                return
+
+            end = min(processed + chunk_size, total)
+            vouchers = [
+                VoucherRecipientDetails(**voucher) for voucher in payload[processed:end]
+            ]
+            succeeded, failed = _process_chunk(
+                job_id, vouchers, processed, job["send-emails"]
+            )
+            if not _checkpoint(job_id, lease, processed, end, succeeded, failed):
+                return
+            processed = end
+
+        bundle_key = _build_bundle(job_id, total, chunk_size)
+        _set_status(
+            job_id,
+            lease,
+            JobStatus.COMPLETED,
+            error=None,
+            **{"bundle-key": bundle_key},
+        )
+
+    except Exception as e:
+        if int(job["attempts"]) < config.JOB_MAX_ATTEMPTS:
+            # Releases the lease, so the retry can claim the job at once.
+            if _set_status(job_id, lease, JobStatus.RUNNING, error=str(e)):
+                raise
+            return
+        logger.error("Giving up on voucher job %s.", job_id, exc_info=True)
+        _set_status(job_id, lease, JobStatus.FAILED, error=str(e))
+
+
+def resume_pending_jobs():
+    """Queues jobs that were queued or interrupted when the process stopped."""
+    table = get_jobs_table()
+    scan_kwargs = {
+        "ProjectionExpression": "#job_id",
+        "FilterExpression": Attr("status").is_in(
+            [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+        ),
+        "ExpressionAttributeNames": {"#job_id": "job-id"},
+    }
+
+    try:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response["Items"]:
+                job_queue.enqueue(item["job-id"])
+            if "LastEvaluatedKey" not in response:
+                return
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    except Exception:
+        logger.warning("Failed to resume pending voucher jobs.", exc_info=True)
+
+
+job_queue = create_job_queue(process_job)
@@ -0,0 +1,311 @@
+import gzip
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterator, Optional
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from domain.entities import VOUCHER_ATTRIBUTES, Voucher, canonical_datetime
+from infrastructure.dynamodb import get_table, projection
+from infrastructure.s3 import store_voucher_archive
+from core.config import config
+from core.metrics import instrumented, metrics
+from core.voucher_cache import voucher_cache
+from constants.enums import VoucherStatus
+
+logger = logging.getLogger(__name__)
+
+
+def _expired_pages(
+    status: VoucherStatus,
+    before: str,
+    attributes: Optional[tuple[str, ...]] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> Iterator[list[dict]]:
+    """
+    Yields pages of the vouchers in a status that expired before a date.
+
+    Reads the status/expiry-date GSI, so the cost tracks the vouchers that
+    are due rather than the size of the table.
+    """
+    request = {
+        "IndexName": config.DYNAMODB_STATUS_INDEX,
+        "KeyConditionExpression": Key("status").eq(status.value)
+        & Key("expiry-date").lt(before),
+        "Limit": config.SWEEP_BATCH_SIZE,
+    }
+    if attributes:
+        request.update(projection(attributes))
+
+    while not should_stop():
+        response = get_table().query(**request)
+        if response.get("Items"):
+            yield response["Items"]
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            return
+        request["ExclusiveStartKey"] = last_evaluated_key
+
+
+def _expired_before(item: dict, before: str) -> bool:
+    # The GSI range compares strings, which only orders canonical expiry
+    # dates by time. Items written before they were canonical, e.g.
+    # "2024-12-31 23:59:59", can fall into the range early, so every item is
+    # checked again by its parsed date until normalize_expiry_dates has run.
+    try:
+        return canonical_datetime(item["expiry-date"]) < before
+    except ValueError:
+        return False
+
+
+def _mark_expired(item: dict) -> bool:
+    # Conditional on the voucher still being unused with the expiry date it
+    # was checked with, so a claim that lands first wins and the voucher
+    # keeps its "used" status.
+    voucher_id = item["voucher-id"]
+    try:
+        get_table().update_item(
+            Key={"voucher-id": voucher_id},
+            UpdateExpression="SET #status = :expired",
+            ConditionExpression="#status = :unused AND #expiry_date = :expiry",
+            ExpressionAttributeNames={
+                "#status": "status",
+                "#expiry_date": "expiry-date",
+            },
+            ExpressionAttributeValues={
+                ":expired": VoucherStatus.EXPIRED.value,
+                ":unused": VoucherStatus.UNUSED.value,
+                ":expiry": item["expiry-date"],
+            },
+        )
+    except ClientError as ce:
+        if ce.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    finally:
+        voucher_cache.invalidate(voucher_id)
+    return True
+
+
+def expire_vouchers(
+    now: Optional[str] = None, should_stop: Callable[[], bool] = lambda: False
+) -> int:
+    """
+    Moves unused vouchers past their expiry date to the "expired" status.
+
+    Returns:
+        int: The number of vouchers marked as expired.
+    """
+    now = canonical_datetime(now or datetime.now())
+    expired = 0
+    with ThreadPoolExecutor(max_workers=config.SWEEP_CONCURRENCY) as executor:
+        for page in _expired_pages(
+            VoucherStatus.UNUSED, now, ("voucher-id", "expiry-date"), should_stop
+        ):
+            due = [item for item in page if _expired_before(item, now)]
+            expired += sum(executor.map(_mark_expired, due))
+    return expired
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _archive_batch(items: list[dict]) -> str:
+    lines = "".join(json.dumps(item, default=_json_default) + "\n" for item in items)
+    return store_voucher_archive(gzip.compress(lines.encode()))
+
+
+def archive_vouchers(
+    before: str, should_stop: Callable[[], bool] = lambda: False
+) -> tuple[int, list[str]]:
+    """
+    Archives vouchers that expired before a date to S3 and deletes them.
+
+    Each GSI page becomes one gzip-compressed NDJSON object holding the full
+    items, and is only deleted once that object is stored. A sweep that fails
+    in between archives the page again on the next run.
+
+    Returns:
+        tuple[int, list[str]]: The number of vouchers archived and the S3 keys
+        of the archive objects.
+    """
+    before = canonical_datetime(before)
+    archived, archives = 0, []
+    for status in VoucherStatus:
+        for page in _expired_pages(status, before, should_stop=should_stop):
+            page = [item for item in page if _expired_before(item, before)]
+            if not page:
+                continue
+            archives.append(_archive_batch(page))
+
+            with get_table().batch_writer() as batch:
+                for item in page:
+                    batch.delete_item(Key={"voucher-id": item["voucher-id"]})
+            for item in page:
+                voucher_cache.invalidate(item["voucher-id"])
+            archived += len(page)
+    return archived, archives
+
+
+def _normalize_expiry(item: dict) -> bool:
+    # Conditional on the stored value, so a concurrent rewrite of the
+    # voucher is not overwritten with a stale date.
+    voucher = Voucher.from_item(item)
+    voucher.expiry_date = canonical_datetime(voucher.expiry_date)
+    values = {":canonical": voucher.expiry_date, ":stored": item["expiry-date"]}
+    ttl = voucher.ttl()
+    if ttl is None:
+        update = "SET #expiry_date = :canonical REMOVE #ttl"
+    else:
+        update = "SET #expiry_date = :canonical, #ttl = :ttl"
+        values[":ttl"] = ttl
+    try:
+        get_table().update_item(
+            Key={"voucher-id": voucher.voucher_id},
+            UpdateExpression=update,
+            ConditionExpression="#expiry_date = :stored",
+            ExpressionAttributeNames={
+                "#expiry_date": "expiry-date",
+                "#ttl": config.VOUCHER_TTL_ATTRIBUTE,
+            },
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as ce:
+        if ce.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        return False
+    finally:
+        voucher_cache.invalidate(voucher.voucher_id)
+    return True
+
+
+@instrumented("voucher_expiry_backfill")
+def normalize_expiry_dates(should_stop: Callable[[], bool] = lambda: False) -> dict:
+    """
+    Rewrites expiry dates stored before they were canonical, such as
+    "2024-12-31 23:59:59" or "2024-12-31", in the canonical_datetime form,
+    and recomputes their TTL.
+
+    The claim condition, the status/expiry-date GSI ranges and the sweep
+    compare expiry dates as strings, so this should run once over existing
+    tables before the sweeper is enabled. Until it has, the sweep checks
+    every candidate by its parsed date, which keeps it from expiring such
+    vouchers early but may expire them late. The whole table is scanned;
+    running it again only rewrites what is still not canonical.
+
+    Args:
+        should_stop (Callable[[], bool]): Checked between pages.
+
+    Returns:
+        dict: The number of vouchers scanned, normalized and skipped because
+        their expiry date is not a valid ISO 8601 datetime.
+    """
+    request = {
+        "Limit": config.SWEEP_BATCH_SIZE,
+        **projection(VOUCHER_ATTRIBUTES.values()),
+    }
+    scanned = normalized = invalid = 0
+    with ThreadPoolExecutor(max_workers=config.SWEEP_CONCURRENCY) as executor:
+        while not should_stop():
+            response = get_table().scan(**request)
+            stale = []
+            for item in response.get("Items", []):
+                scanned += 1
+                try:
+                    if canonical_datetime(item["expiry-date"]) != item["expiry-date"]:
+                        stale.append(item)
+                except ValueError:
+                    invalid += 1
+                    logger.warning(
+                        "Voucher %s has an invalid expiry date %r.",
+                        item["voucher-id"],
+                        item["expiry-date"],
+                    )
+            normalized += sum(executor.map(_normalize_expiry, stale))
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                break
+            request["ExclusiveStartKey"] = last_evaluated_key
+
+    logger.info(
+        "Expiry backfill scanned %d vouchers and normalized %d.", scanned, normalized
+    )
+    return {"scanned": scanned, "normalized": normalized, "invalid": invalid}
+
+
+@instrumented("voucher_sweep")
+def sweep_expired_vouchers(should_stop: Callable[[], bool] = lambda: False) -> dict:
+    """
+    Expires unused vouchers past their expiry date, then archives and deletes
+    those that expired more than VOUCHER_ARCHIVE_AFTER_DAYS ago.
+
+    Args:
+        should_stop (Callable[[], bool]): Checked between pages, so a sweep
+            can be interrupted on shutdown.
+
+    Returns:
+        dict: The number of vouchers expired and archived, and the S3 keys of
+        the archive objects.
+    """
+    now = datetime.now()
+    expired = expire_vouchers(canonical_datetime(now), should_stop)
+    cutoff = now - timedelta(days=config.VOUCHER_ARCHIVE_AFTER_DAYS)
+    archived, archives = archive_vouchers(canonical_datetime(cutoff), should_stop)
+
+    metrics.increment("vouchers_expired_total", value=expired)
+    metrics.increment("vouchers_archived_total", value=archived)
+    logger.info("Voucher sweep expired %d and archived %d vouchers.", expired, archived)
+    return {"expired": expired, "archived": archived, "archives": archives}
+
+
+class VoucherSweeper:
+    """
+    Sweeps expired vouchers every SWEEP_INTERVAL seconds on a background
+    thread, starting one interval after start.
+
+    Instances sweeping at the same time are harmless: expiring is a
+    conditional write and deleting is idempotent, so at worst a page is
+    archived twice.
+    """
+
+    def __init__(self, interval: float = config.SWEEP_INTERVAL):
+        self._interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self._interval <= 0:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="voucher-sweeper", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the sweeper, interrupting a sweep in progress after its page."""
+        with self._lock:
+            self._stopping.set()
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+    def _run(self):
+        while not self._stopping.wait(self._interval):
+            try:
+                sweep_expired_vouchers(self._stopping.is_set)
+            except Exception:
+                logger.warning("Voucher sweep failed.", exc_info=True)
+
+
+sweeper = VoucherSweeper()
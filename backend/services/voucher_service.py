@@ -1,18 +1,148 @@
+import json
 import uuid
+import logging
+from dataclasses import asdict
+import queue
+import base64
+import binascii
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
-from domain.models import VoucherResponse
-from domain.entities import Voucher
-from infrastructure.dynamodb import table
-from utils.qr_generator import generate_qr_code
-from utils.send_email import send_email
-from constants.enums import VoucherStatus
+from typing import Collection, Iterator, Optional
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
+from domain.models import (
+    VoucherDetails,
+    VoucherRecipientDetails,
+    VoucherResponse,
+    VoucherBatchItemResult,
+    VoucherClaimResult,
+)
+from domain.entities import (
+    VOUCHER_ATTRIBUTES,
+    Voucher,
+    canonical_datetime,
+    canonical_now,
+)
+from infrastructure.dynamodb import get_dynamodb, get_table, projection
+from infrastructure.s3 import store_voucher_pdf
+from core.executors import submit_render
+from services.email_delivery import deliver_voucher_email
+from core.config import config
+from core.render_cache import render_cache, render_key, template_etag
+from core.voucher_cache import voucher_cache
+from constants.enums import (
+    VoucherStatus,
+    BatchOutputFormat,
+    BatchItemStatus,
+    ClaimResult,
+    VoucherFormat,
+)
 
+_deserializer = TypeDeserializer()
+logger = logging.getLogger(__name__)
 
-# TODO: Remove this import
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+def _store_pdf(voucher_id: str, pdf: bytes) -> Optional[str]:
+    # The stored PDF only saves a re-render later, so a failed upload must not
+    # fail the issuance.
+    try:
+        return store_voucher_pdf(pdf)
+    except Exception:
+        logger.warning("Failed to store PDF of voucher %s.", voucher_id, exc_info=True)
+        return None
+
+
+def _voucher_render_key(
+    etag: str, unique_id: str, expiry_date: str, voucher_format: VoucherFormat
+) -> str:
+    from utils.qr_generator import RENDERER_VERSION
+
+    return render_key(
+        config.VOUCHER_TEMPLATE,
+        etag,
+        unique_id,
+        expiry_date,
+        VoucherFormat(voucher_format).value,
+        RENDERER_VERSION,
+    )
+
+
+def _submit_voucher_render(
+    unique_id: str, expiry_date: str, voucher_format: VoucherFormat = VoucherFormat.PDF
+) -> Future:
+    """
+    Submits a single-voucher render to the render pool, or answers it from
+    the render cache if the voucher was rendered before with the current
+    template. Cache hits never touch the pool, PIL or ReportLab.
+
+    Lookups use the template's ETag from a cached HEAD request, while renders
+    are stored under the ETag the worker actually drew with, so output from
+    a template the lookup has not caught up with yet is never filed under
+    the newer one.
+    """
+    # The PDF stack (PIL, qrcode, ReportLab) is only imported once a request
+    # actually renders, so claim and listing cold starts do not pay for it.
+    from utils.qr_generator import render_voucher, render_voucher_tagged
+
+    if not config.RENDER_CACHE_ENABLED:
+        return submit_render(render_voucher, unique_id, expiry_date, voucher_format)
+
+    try:
+        etag = template_etag(config.VOUCHER_TEMPLATE)
+    except Exception:
+        etag = None  # Left to the render, which reports template errors as usual.
+
+    if etag is not None:
+        cached = render_cache.get(
+            _voucher_render_key(etag, unique_id, expiry_date, voucher_format)
+        )
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+
+    tagged = submit_render(
+        render_voucher_tagged, unique_id, expiry_date, voucher_format
+    )
+    future = Future()
+
+    def unwrap(done: Future):
+        if done.cancelled():
+            future.cancel()
+            return
+        if done.exception() is not None:
+            future.set_exception(done.exception())
+            return
+        output, rendered_etag = done.result()
+        if rendered_etag is not None:
+            render_cache.put(
+                _voucher_render_key(
+                    rendered_etag, unique_id, expiry_date, voucher_format
+                ),
+                output,
+            )
+        future.set_result(output)
+
+    tagged.add_done_callback(unwrap)
+    return future
+
+
+def _render_result(future: Future) -> bytes:
+    """
+    Waits for a render, turning a RenderError from the pool worker into the
+    HTTPException the routes answer with.
+    """
+    from utils.qr_generator import RenderError
+
+    try:
+        return future.result()
+    except RenderError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
 def create_voucher(
@@ -20,78 +150,655 @@ def create_voucher(
     last_name: str,
     expiry_date: str,
     percentage: str,
-) -> BytesIO:
+    voucher_format: VoucherFormat = VoucherFormat.PDF,
+) -> bytes:
     unique_id = str(uuid.uuid4())
-    image = generate_qr_code(unique_id, expiry_date)
+    image = _render_result(
+        _submit_voucher_render(unique_id, expiry_date, voucher_format)
+    )
+
+    voucher = Voucher(unique_id, first_name, last_name, expiry_date, percentage)
+    item = voucher.to_item()
 
-    # TODO: Remove this line. This is just for testing purposes.
-    send_email(os.getenv("EMAIL_ADDRESS"), image)
+    # Only PDFs are stored. For image output the PDF is rendered on the first
+    # download instead, see get_voucher_pdf_key.
+    if voucher_format == VoucherFormat.PDF:
+        pdf_key = _store_pdf(unique_id, image)
+        if pdf_key:
+            item["pdf-key"] = pdf_key
 
-    voucher = {
-        "voucher-id": unique_id,
-        "first-name": first_name,
-        "last-name": last_name,
-        "expiry-date": expiry_date,
-        "percentage": percentage,
-        "status": VoucherStatus.UNUSED.value,
-    }
+    get_table().put_item(Item=item)
+    voucher_cache.put(unique_id, asdict(voucher))
+
+    # The voucher is stored by now, so failing the request would only make a
+    # retrying client issue it twice.
+    try:
+        # TODO: Send to the recipient instead. This is just for testing purposes.
+        deliver_voucher_email(
+            config.EMAIL_ADDRESS,
+            image,
+            f"Atletika_Voucher.{VoucherFormat(voucher_format).value}",
+        )
+    except Exception:
+        logger.warning("Failed to email voucher %s.", unique_id, exc_info=True)
 
-    table.put_item(Item=voucher)
     return image
 
 
-def claim_voucher(voucher_id: str):
-    response = table.get_item(Key={"voucher-id": voucher_id})
+def _voucher_item(
+    unique_id: str, voucher_details: VoucherDetails, pdf_key: Optional[str] = None
+) -> dict:
+    item = Voucher(
+        unique_id,
+        voucher_details.first_name,
+        voucher_details.last_name,
+        voucher_details.expiry_date,
+        voucher_details.percentage,
+    ).to_item()
+    if pdf_key:
+        item["pdf-key"] = pdf_key
+    return item
+
+
+# BatchGetItem accepts at most this many keys per request.
+_BATCH_GET_SIZE = 100
+
+
+def existing_voucher_ids(voucher_ids: list[str]) -> set[str]:
+    """Returns which of the given voucher IDs are already in the table."""
+    existing = set()
+    for start in range(0, len(voucher_ids), _BATCH_GET_SIZE):
+        request = {
+            config.DYNAMODB_TABLE: {
+                "Keys": [
+                    {"voucher-id": voucher_id}
+                    for voucher_id in voucher_ids[start : start + _BATCH_GET_SIZE]
+                ],
+                **projection(("voucher-id",)),
+            }
+        }
+        attempt = 0
+        while request:
+            if attempt:
+                time.sleep(min(0.05 * 2**attempt, 1))
+            response = get_dynamodb().batch_get_item(RequestItems=request)
+            existing.update(
+                item["voucher-id"]
+                for item in response["Responses"].get(config.DYNAMODB_TABLE, [])
+            )
+            request = response.get("UnprocessedKeys")
+            attempt += 1
+    return existing
+
+
+def _render_error(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error)
+
+
+def issue_vouchers(
+    unique_ids: list[str],
+    vouchers: list[VoucherDetails],
+    start: int = 0,
+    existing: Collection[str] = (),
+) -> tuple[list[Optional[bytes]], list[VoucherBatchItemResult]]:
+    """
+    Renders vouchers as individual PDFs across the render pool, stores them in
+    S3 and writes the successfully rendered ones to DynamoDB.
+
+    Args:
+        unique_ids (list[str]): The IDs to issue the vouchers under.
+        vouchers (list[VoucherDetails]): The vouchers to issue.
+        start (int): The index of the first voucher, used in the report.
+        existing (Collection[str]): IDs that were issued before. They are
+            rendered and reported, but neither stored nor written again, so a
+            voucher claimed in the meantime keeps its status.
+
+    Returns:
+        tuple[list[Optional[bytes]], list[VoucherBatchItemResult]]: The PDFs,
+        None where rendering failed, and a per-item report in order.
+    """
+    futures = [
+        _submit_voucher_render(unique_id, details.expiry_date)
+        for unique_id, details in zip(unique_ids, vouchers)
+    ]
+    rendered, errors = [], []
+    for future in futures:
+        try:
+            rendered.append(_render_result(future))
+            errors.append(None)
+        except Exception as e:
+            rendered.append(None)
+            errors.append(_render_error(e))
+
+    with ThreadPoolExecutor(max_workers=config.ARTIFACT_UPLOAD_CONCURRENCY) as executor:
+        pdf_keys = list(
+            executor.map(
+                lambda unique_id, pdf: (
+                    _store_pdf(unique_id, pdf)
+                    if pdf and unique_id not in existing
+                    else None
+                ),
+                unique_ids,
+                rendered,
+            )
+        )
+
+    results = []
+    with get_table().batch_writer() as batch:
+        for index, (unique_id, details, error, pdf_key) in enumerate(
+            zip(unique_ids, vouchers, errors, pdf_keys), start
+        ):
+            if error is not None:
+                results.append(
+                    VoucherBatchItemResult(
+                        index=index, status=BatchItemStatus.FAILED.value, error=error
+                    )
+                )
+                continue
+
+            if unique_id not in existing:
+                batch.put_item(Item=_voucher_item(unique_id, details, pdf_key))
+            results.append(
+                VoucherBatchItemResult(
+                    index=index,
+                    voucher_id=unique_id,
+                    status=BatchItemStatus.SUCCESS.value,
+                )
+            )
+
+    return rendered, results
+
+
+def email_vouchers(
+    unique_ids: list[str],
+    vouchers: list[VoucherRecipientDetails],
+    rendered: list[Optional[bytes]],
+):
+    """
+    Hands the rendered vouchers to email delivery, each to its own recipient.
+    Vouchers without an email address and failed renders are skipped. A
+    failed delivery is logged and does not affect the others.
+    """
+    for unique_id, details, pdf in zip(unique_ids, vouchers, rendered):
+        if pdf is None or details.email is None:
+            continue
+        try:
+            deliver_voucher_email(details.email, pdf)
+        except Exception:
+            logger.warning("Failed to email voucher %s.", unique_id, exc_info=True)
+
+
+def create_vouchers_batch(
+    vouchers: list[VoucherDetails],
+    output_format: BatchOutputFormat = BatchOutputFormat.ZIP,
+) -> tuple[bytes, list[VoucherBatchItemResult]]:
+    """
+    Renders and persists a batch of vouchers.
+
+    ZIP output renders every voucher as its own PDF, spread across the render
+    pool. PDF output renders all vouchers as pages of a single document in one
+    pool worker, so a render failure fails the whole batch. Only successfully
+    rendered vouchers are written to DynamoDB.
+
+    Args:
+        vouchers (list[VoucherDetails]): The vouchers to issue.
+        output_format (BatchOutputFormat): Whether to bundle the PDFs as a ZIP
+            archive or a single multi-page PDF.
+
+    Returns:
+        tuple[bytes, list[VoucherBatchItemResult]]: The bundle and a
+        per-item report in request order.
+    """
+    from utils.qr_generator import render_voucher_pdf_batch
+
+    unique_ids = [str(uuid.uuid4()) for _ in vouchers]
+
+    if output_format == BatchOutputFormat.PDF:
+        pages = [
+            (unique_id, details.expiry_date)
+            for unique_id, details in zip(unique_ids, vouchers)
+        ]
+        document = _render_result(submit_render(render_voucher_pdf_batch, pages))
+
+        results = []
+        with get_table().batch_writer() as batch:
+            for index, (unique_id, details) in enumerate(zip(unique_ids, vouchers)):
+                batch.put_item(Item=_voucher_item(unique_id, details))
+                results.append(
+                    VoucherBatchItemResult(
+                        index=index,
+                        voucher_id=unique_id,
+                        status=BatchItemStatus.SUCCESS.value,
+                    )
+                )
+        return document, results
+
+    rendered, results = issue_vouchers(unique_ids, vouchers)
+
+    bundle = BytesIO()
+    with zipfile.ZipFile(bundle, "w") as archive:
+        for unique_id, pdf in zip(unique_ids, rendered):
+            if pdf is not None:
+                archive.writestr(f"{unique_id}.pdf", pdf)
+        archive.writestr(
+            "report.json", json.dumps([result.model_dump() for result in results])
+        )
+
+    # getvalue() hands over the finished buffer without copying it.
+    return bundle.getvalue(), results
+
+
+def _cache_claim(
+    voucher_id: str, claimed: Optional[Voucher], current: Optional[Voucher]
+):
+    # Every claim attempt returns the voucher's current state, so the cache is
+    # written through rather than merely invalidated.
+    voucher = claimed or current
+    if voucher is None:
+        voucher_cache.invalidate(voucher_id)
+    else:
+        voucher_cache.put(voucher_id, asdict(voucher))
+
+
+def _conditional_claim(voucher_id: str) -> tuple[Optional[Voucher], Optional[Voucher]]:
+    """
+    Marks a voucher as used in a single conditional write.
+
+    The update only succeeds while the voucher exists, is unused and has not
+    expired, so concurrent claims of the same voucher have exactly one winner.
+
+    Returns:
+        tuple[Optional[Voucher], Optional[Voucher]]: The claimed voucher, or
+        None together with the voucher as it was when the condition failed
+        (None as well if it does not exist).
+    """
+    try:
+        response = get_table().update_item(
+            Key={"voucher-id": voucher_id},
+            UpdateExpression="SET #status = :used",
+            ConditionExpression=(
+                "attribute_exists(#voucher_id) AND #status = :unused "
+                "AND #expiry_date > :now"
+            ),
+            ExpressionAttributeNames={
+                "#voucher_id": "voucher-id",
+                "#status": "status",
+                "#expiry_date": "expiry-date",
+            },
+            ExpressionAttributeValues={
+                ":used": VoucherStatus.USED.value,
+                ":unused": VoucherStatus.UNUSED.value,
+                ":now": canonical_now(),
+            },
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+
+    except ClientError as ce:
+        if ce.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            voucher_cache.invalidate(voucher_id)
+            raise
+
+        old_item = ce.response.get("Item")
+        current = None
+        if old_item:
+            current = Voucher.from_item(
+                {
+                    key: _deserializer.deserialize(value)
+                    for key, value in old_item.items()
+                }
+            )
+        _cache_claim(voucher_id, None, current)
+        return None, current
+
+    claimed = Voucher.from_item(response["Attributes"])
+    _cache_claim(voucher_id, claimed, None)
+    return claimed, None
+
+
+def claim_voucher(voucher_id: str) -> Voucher:
+    """
+    Claims a voucher in a single round trip.
+
+    Raises:
+        ValueError: If the voucher does not exist.
+        HTTPException: If the voucher was already claimed or has expired.
+    """
+    claimed, current = _conditional_claim(voucher_id)
+    if claimed is not None:
+        return claimed
+
+    if current is None:
+        raise ValueError("Voucher not found.")
+
+    # Raises the matching "already claimed" or "expired" error.
+    current.mark_as_used()
+    raise HTTPException(status_code=409, detail="Voucher could not be claimed.")
+
+
+def _claim_result(voucher_id: str) -> VoucherClaimResult:
+    try:
+        claimed, current = _conditional_claim(voucher_id)
+    except Exception as e:
+        return VoucherClaimResult(
+            voucher_id=voucher_id, result=ClaimResult.FAILED.value, detail=str(e)
+        )
+
+    if claimed is not None:
+        result = ClaimResult.CLAIMED
+    elif current is None:
+        result = ClaimResult.NOT_FOUND
+    elif current.is_used():
+        result = ClaimResult.ALREADY_USED
+    elif current.is_expired():
+        result = ClaimResult.EXPIRED
+    else:
+        result = ClaimResult.FAILED
+
+    return VoucherClaimResult(voucher_id=voucher_id, result=result.value)
+
+
+def claim_vouchers_batch(voucher_ids: list[str]) -> list[VoucherClaimResult]:
+    """
+    Claims several vouchers concurrently, e.g. scans replayed by a POS tablet
+    after it reconnects.
+
+    Each voucher is claimed with the same conditional write as claim_voucher,
+    with at most CLAIM_BATCH_CONCURRENCY claims in flight. A voucher ID that
+    appears twice is claimed once and reported as already used the second time.
+
+    Returns:
+        list[VoucherClaimResult]: One result per requested ID, in request order.
+    """
+    max_workers = min(config.CLAIM_BATCH_CONCURRENCY, len(voucher_ids))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_claim_result, voucher_ids))
+
+
+def get_voucher(voucher_id: str) -> VoucherResponse:
+    """
+    Returns a voucher's details, from the voucher cache when possible.
+
+    Claims go straight to DynamoDB with a conditional write, so a stale cache
+    entry can never let a voucher be claimed twice.
+
+    Raises:
+        ValueError: If the voucher does not exist.
+    """
+    cached = voucher_cache.get(voucher_id)
+    if cached is not None:
+        return VoucherResponse(**cached)
+
+    response = get_table().get_item(
+        Key={"voucher-id": voucher_id}, **projection(VOUCHER_ATTRIBUTES.values())
+    )
     voucher_data = response.get("Item")
 
     if not voucher_data:
         raise ValueError("Voucher not found.")
 
-    voucher = Voucher(
-        voucher_id=voucher_data["voucher-id"],
-        first_name=voucher_data["first-name"],
-        last_name=voucher_data["last-name"],
-        expiry_date=voucher_data["expiry-date"],
-        percentage=voucher_data["percentage"],
-        status=voucher_data["status"],
-    )
-    voucher.mark_as_used()
+    voucher = Voucher.from_item(voucher_data)
+    # A claim that lands between the read and this write has already written
+    # the newer state through, which must not be overwritten.
+    voucher_cache.put(voucher_id, asdict(voucher), only_if_absent=True)
+
+    return VoucherResponse.model_validate(voucher)
 
-    table.update_item(
-        Key={"voucher-id": voucher_id},
-        UpdateExpression="SET #status = :new_status",
-        ExpressionAttributeNames={"#status": "status"},
-        ExpressionAttributeValues={":new_status": VoucherStatus.USED.value},
-    )
 
-    return voucher
+def get_voucher_pdf_key(voucher_id: str, rerender: bool = False) -> str:
+    """
+    Returns the S3 key of a voucher's stored PDF, rendering it on a miss.
 
+    Vouchers issued before PDFs were stored, or whose upload failed, are
+    rendered once, stored and recorded on the item.
 
-def get_voucher(voucher_id: str) -> Voucher:
-    response = table.get_item(Key={"voucher-id": voucher_id})
+    Args:
+        voucher_id (str): The voucher ID.
+        rerender (bool): Render and store the PDF even if a key is recorded,
+            e.g. because the object has gone missing.
+
+    Raises:
+        ValueError: If the voucher does not exist.
+    """
+    response = get_table().get_item(
+        Key={"voucher-id": voucher_id}, **projection(("expiry-date", "pdf-key"))
+    )
     voucher_data = response.get("Item")
 
     if not voucher_data:
         raise ValueError("Voucher not found.")
 
-    voucher = VoucherResponse(
-        voucher_id=voucher_data["voucher-id"],
-        first_name=voucher_data["first-name"],
-        last_name=voucher_data["last-name"],
-        expiry_date=voucher_data["expiry-date"],
-        percentage=voucher_data["percentage"],
-        status=voucher_data["status"],
+    if voucher_data.get("pdf-key") and not rerender:
+        return voucher_data["pdf-key"]
+
+    pdf = _render_result(
+        _submit_voucher_render(voucher_id, voucher_data["expiry-date"])
     )
+    pdf_key = store_voucher_pdf(pdf)
+
+    try:
+        # Conditional, so a voucher archived meanwhile is not recreated as a
+        # bare item holding only the key.
+        get_table().update_item(
+            Key={"voucher-id": voucher_id},
+            UpdateExpression="SET #pdf_key = :pdf_key",
+            ConditionExpression="attribute_exists(#voucher_id)",
+            ExpressionAttributeNames={
+                "#pdf_key": "pdf-key",
+                "#voucher_id": "voucher-id",
+            },
+            ExpressionAttributeValues={":pdf_key": pdf_key},
+        )
+    except ClientError as ce:
+        if ce.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            raise ValueError("Voucher not found.")
+        raise
+    return pdf_key
+
+
+def _encode_cursor(last_evaluated_key: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
 
-    return voucher
 
+# The key attributes of a LastEvaluatedKey: the table's for a scan, and the
+# table's plus the status/expiry-date GSI's for a query.
+_SCAN_CURSOR_KEYS = frozenset({"voucher-id"})
+_QUERY_CURSOR_KEYS = frozenset({"voucher-id", "status", "expiry-date"})
 
-def get_all_vouchers():
+
+def _decode_cursor(cursor: str, key_attributes: frozenset[str]) -> dict:
+    """
+    Decodes a cursor into an ExclusiveStartKey, checking that it holds exactly
+    the string key attributes of the scan or query it is passed to.
+    """
     try:
-        response = table.scan()
-        vouchers = response.get("Items", [])
+        start_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid pagination cursor.")
+
+    if (
+        not isinstance(start_key, dict)
+        or start_key.keys() != key_attributes
+        or not all(isinstance(value, str) for value in start_key.values())
+    ):
+        raise ValueError("Invalid pagination cursor.")
+    return start_key
+
+
+def _expiry_condition(
+    condition_type, expires_after: Optional[str], expires_before: Optional[str]
+):
+    expiry = condition_type("expiry-date")
+    # Stored expiry dates are canonical, so the bounds must be too for the
+    # string comparison to order them by time.
+    expires_after = expires_after and canonical_datetime(expires_after)
+    expires_before = expires_before and canonical_datetime(expires_before)
+    if expires_after and expires_before:
+        return expiry.between(expires_after, expires_before)
+    if expires_after:
+        return expiry.gte(expires_after)
+    if expires_before:
+        return expiry.lte(expires_before)
+    return None
+
+
+def list_vouchers(
+    limit: int = config.VOUCHER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[VoucherStatus] = None,
+    expires_after: Optional[str] = None,
+    expires_before: Optional[str] = None,
+) -> tuple[list[Voucher], Optional[str]]:
+    """
+    Returns one page of vouchers and the cursor for the next page.
+
+    Filtering by status queries the status/expiry-date GSI, with the expiry
+    range applied as part of the key condition. Without a status the table is
+    scanned and the expiry range is applied as a filter, so a page may hold
+    fewer than `limit` items even when more remain.
+
+    Args:
+        limit (int): The maximum number of items to evaluate.
+        cursor (Optional[str]): The cursor returned with the previous page.
+        status (Optional[VoucherStatus]): Only return vouchers in this status.
+        expires_after (Optional[str]): Inclusive lower bound on the expiry date.
+        expires_before (Optional[str]): Inclusive upper bound on the expiry date.
+
+    Returns:
+        tuple[list[Voucher], Optional[str]]: The vouchers and the next cursor,
+        or None on the last page.
+    """
+    request = {"Limit": limit, **projection(VOUCHER_ATTRIBUTES.values())}
+
+    if status is not None:
+        if cursor:
+            start_key = _decode_cursor(cursor, _QUERY_CURSOR_KEYS)
+            # A cursor from another status' pages would start mid-partition.
+            if start_key["status"] != VoucherStatus(status).value:
+                raise ValueError("Invalid pagination cursor.")
+            request["ExclusiveStartKey"] = start_key
+
+        key_condition = Key("status").eq(VoucherStatus(status).value)
+        expiry = _expiry_condition(Key, expires_after, expires_before)
+        if expiry is not None:
+            key_condition = key_condition & expiry
+
+        response = get_table().query(
+            IndexName=config.DYNAMODB_STATUS_INDEX,
+            KeyConditionExpression=key_condition,
+            **request,
+        )
+    else:
+        if cursor:
+            request["ExclusiveStartKey"] = _decode_cursor(cursor, _SCAN_CURSOR_KEYS)
+        expiry = _expiry_condition(Attr, expires_after, expires_before)
+        if expiry is not None:
+            request["FilterExpression"] = expiry
+
+        response = get_table().scan(**request)
+
+    last_evaluated_key = response.get("LastEvaluatedKey")
+    next_cursor = _encode_cursor(last_evaluated_key) if last_evaluated_key else None
+    return [Voucher.from_item(item) for item in response.get("Items", [])], next_cursor
+
+
+_SEGMENT_DONE = object()
 
-        return vouchers
 
+def _put_page(pages: queue.Queue, page, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            pages.put(page, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+def _scan_pages(
+    attributes: Optional[list[str]],
+    segment: Optional[int] = None,
+    total_segments: Optional[int] = None,
+):
+    request = {"Limit": config.EXPORT_PAGE_SIZE}
+    if attributes:
+        request.update(projection(attributes))
+    if total_segments is not None:
+        request["Segment"] = segment
+        request["TotalSegments"] = total_segments
+
+    while True:
+        response = get_table().scan(**request)
+        yield response.get("Items", [])
+
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            return
+        request["ExclusiveStartKey"] = last_evaluated_key
+
+
+def _scan_segment(
+    attributes: Optional[list[str]],
+    segment: int,
+    total_segments: int,
+    pages: queue.Queue,
+    stop: threading.Event,
+):
+    try:
+        for page in _scan_pages(attributes, segment, total_segments):
+            if stop.is_set():
+                return
+            _put_page(pages, page, stop)
     except Exception as e:
-        raise e
+        _put_page(pages, e, stop)
+    finally:
+        _put_page(pages, _SEGMENT_DONE, stop)
+
+
+def scan_all_vouchers(
+    segments: int = 1, attributes: Optional[list[str]] = None
+) -> Iterator[dict]:
+    """
+    Yields every voucher item in the table, one Scan page at a time.
+
+    With more than one segment, each segment is scanned by its own thread
+    (parallel Scan) and pages are handed over through a bounded queue. This
+    keeps memory bounded by a few pages, however large the table is. Items
+    are yielded in no particular order.
+
+    Args:
+        segments (int): The number of parallel Scan segments.
+        attributes (Optional[list[str]]): Only read these attributes. All
+            attributes are read by default.
+
+    Yields:
+        dict: Raw DynamoDB items with their hyphenated attribute names.
+    """
+    if segments <= 1:
+        for page in _scan_pages(attributes):
+            yield from page
+        return
+
+    pages: queue.Queue = queue.Queue(maxsize=segments * 2)
+    stop = threading.Event()
+    for segment in range(segments):
+        threading.Thread(
+            target=_scan_segment,
+            args=(attributes, segment, segments, pages, stop),
+            name=f"voucher-scan-{segment}",
+            daemon=True,
+        ).start()
+
+    try:
+        remaining = segments
+        while remaining:
+            page = pages.get()
+            if page is _SEGMENT_DONE:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        stop.set()
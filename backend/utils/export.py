@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+EXPORT_FIELDS = [
+    "voucher-id",
+    "first-name",
+    "last-name",
+    "expiry-date",
+    "percentage",
+    "status",
+]
+
+# Rows are flushed in chunks of roughly this many characters, so the response
+# is not sent one tiny write per row.
+CHUNK_SIZE = 64 * 1024
+
+
+def to_ndjson(items: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+
+    for item in items:
+        json.dump(
+            {field: item.get(field) for field in EXPORT_FIELDS}, buffer, default=str
+        )
+        buffer.write("\n")
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def to_csv(items: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_FIELDS)
+    for item in items:
+        writer.writerow([item.get(field, "") for field in EXPORT_FIELDS])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
@@ -1,87 +1,402 @@
 import io
+import os
+import copy
+import hashlib
+import logging
+import threading
 import qrcode
-from PIL import Image
-from fastapi import HTTPException
+import reportlab
+from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
-from infrastructure.s3 import retrieve_template
+from typing import Optional
+from utils.template_cache import CachedTemplate, get_template
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
 from reportlab.lib.utils import ImageReader
+from constants.enums import VOUCHER_MEDIA_TYPES, QRRenderMode, VoucherFormat
 
+logger = logging.getLogger(__name__)
 
-def generate_qr_code(unique_id: str, expiry_date: str) -> io.BytesIO:
-    try:
-        # Fetch the image from S3 as bytes
-        img_bytes = retrieve_template("voucher-atletika.png")
-        base_image = Image.open(io.BytesIO(img_bytes))
-
-        # Ensure PNG is in RGB mode
-        if base_image.mode in ("RGBA", "LA"):
-            white_bg = Image.new("RGB", base_image.size, (255, 255, 255))
-            white_bg.paste(
-                base_image, mask=base_image.split()[3]
-            )  # Apply alpha channel as mask
-            base_image = white_bg
-
-        img_width, img_height = base_image.size
-
-        image_io = io.BytesIO()
-        base_image.save(image_io, format="PNG", optimize=True)
-        image_io.seek(0)
-        image_reader = ImageReader(image_io)
-
-        pdf_io = io.BytesIO()
-        pdf_canvas = canvas.Canvas(pdf_io, pagesize=(img_width, img_height))
-
-        pdf_canvas.drawImage(image_reader, 0, 0, width=img_width, height=img_height)
-
-        # Generate QR Code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+BACKGROUND_FORM = "VoucherBackground"
+# Part of every render cache key. Bump it whenever a change to this module
+# alters the output, so earlier renders are no longer served.
+RENDERER_VERSION = "1"
+QR_SIZE = 515
+QR_X = 22
+QR_Y = 43
+DATE_FONT_SIZE = 20
+DATE_X = 960
+DATE_Y = 80
+# Helvetica is built into PDF viewers but has no font file to rasterize, so
+# image output uses the closest face ReportLab ships, Bitstream Vera Sans Bold.
+DATE_FONT_FILE = os.path.join(
+    os.path.dirname(reportlab.__file__), "fonts", "VeraBd.ttf"
+)
+
+
+class RenderError(Exception):
+    """
+    A failed render, with the HTTP status and detail it should be answered with.
+
+    Renders run on a process pool, and the error has to be pickled back to the
+    parent. HTTPException cannot be unpickled, and an error that fails to
+    unpickle breaks the whole pool, so the service turns this into one instead.
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+    def __str__(self) -> str:
+        return self.detail
+
+
+_background_images: dict[str, pdfdoc.PDFImageXObject] = {}
+_background_lock = threading.Lock()
+_shared_background_supported: Optional[bool] = None
+
+
+def _background_image(template: CachedTemplate) -> pdfdoc.PDFImageXObject:
+    # Compressing the raw template raster is the most expensive part of embedding
+    # it, so the image XObject is built once per template version and process.
+    key = f"{template.name}:{template.etag}"
+    image = _background_images.get(key)
+    if image is None:
+        with _background_lock:
+            image = _background_images.get(key)
+            if image is None:
+                name = "Template" + hashlib.md5(key.encode("utf-8")).hexdigest()
+                image = pdfdoc.PDFImageXObject(name, template.reader)
+                image.name = name
+                _background_images[key] = image
+    return image
+
+
+def _supports_shared_background(pdf_canvas: canvas.Canvas) -> bool:
+    """
+    Checks for the ReportLab internals _define_background_form relies on. They
+    are verified against the version pinned in requirements.txt; on another
+    version without them, every page draws the template itself instead.
+    """
+    global _shared_background_supported
+
+    if _shared_background_supported is None:
+        doc = getattr(pdf_canvas, "_doc", None)
+        _shared_background_supported = (
+            isinstance(getattr(pdf_canvas, "_code", None), list)
+            and isinstance(getattr(pdf_canvas, "_formsinuse", None), list)
+            and callable(getattr(doc, "Reference", None))
+            and callable(getattr(doc, "getXObjectName", None))
+        )
+        if not _shared_background_supported:
+            logger.warning(
+                "ReportLab %s lacks the internals for a shared voucher "
+                "background; drawing the template on every page.",
+                reportlab.Version,
+            )
+    return _shared_background_supported
+
+
+def _define_background_form(pdf_canvas: canvas.Canvas, template: CachedTemplate):
+    """
+    Registers the template as a form XObject on the canvas' document.
+
+    Every page drawn with doForm(BACKGROUND_FORM) then references the same
+    embedded raster instead of carrying its own copy.
+    """
+    # A ReportLab object can only be registered with one document, so each
+    # document gets a shallow copy sharing the precompressed stream.
+    image = copy.copy(_background_image(template))
+    doc = pdf_canvas._doc
+    image_name = doc.getXObjectName(image.name)
+    doc.Reference(image, image_name)
+
+    pdf_canvas.beginForm(BACKGROUND_FORM)
+    pdf_canvas.saveState()
+    pdf_canvas.scale(template.width, template.height)
+    pdf_canvas._code.append(f"/{image_name} Do")
+    pdf_canvas._formsinuse.append(image.name)
+    pdf_canvas.restoreState()
+    pdf_canvas.endForm()
+
+
+def _build_qr(unique_id: str) -> qrcode.QRCode:
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(unique_id)
+    qr.make(fit=True)
+    return qr
+
+
+def _draw_qr_raster(pdf_canvas: canvas.Canvas, qr: qrcode.QRCode):
+    qr_img = qr.make_image(fill="black", back_color="white")
+    qr_img = qr_img.resize((QR_SIZE, QR_SIZE), Image.LANCZOS)
+
+    # ReportLab reads the pixels straight from the PIL image, so the QR code
+    # is not encoded to PNG and decoded again on the way.
+    pdf_canvas.drawImage(ImageReader(qr_img), QR_X, QR_Y, width=QR_SIZE, height=QR_SIZE)
+
+
+def _draw_qr_vector(pdf_canvas: canvas.Canvas, qr: qrcode.QRCode):
+    # The matrix includes the quiet zone, so it covers the same area as the
+    # raster image. Dark modules are merged into horizontal runs to keep the
+    # path short.
+    matrix = qr.get_matrix()
+    module = QR_SIZE / len(matrix)
+
+    pdf_canvas.saveState()
+    pdf_canvas.setFillColorRGB(1, 1, 1)
+    pdf_canvas.rect(QR_X, QR_Y, QR_SIZE, QR_SIZE, stroke=0, fill=1)
+
+    path = pdf_canvas.beginPath()
+    for row_index, row in enumerate(matrix):
+        y = QR_Y + QR_SIZE - (row_index + 1) * module
+        run_start = None
+        for col_index, dark in enumerate(row + [False]):
+            if dark and run_start is None:
+                run_start = col_index
+            elif not dark and run_start is not None:
+                path.rect(
+                    QR_X + run_start * module,
+                    y,
+                    (col_index - run_start) * module,
+                    module,
+                )
+                run_start = None
+
+    pdf_canvas.setFillColorRGB(0, 0, 0)
+    pdf_canvas.drawPath(path, stroke=0, fill=1)
+    pdf_canvas.restoreState()
+
+
+def _format_date(expiry_date: str) -> str:
+    return datetime.fromisoformat(expiry_date).strftime("%B %d, %Y")
+
+
+def _draw_voucher_page(
+    pdf_canvas: canvas.Canvas,
+    template: CachedTemplate,
+    unique_id: str,
+    expiry_date: str,
+    shared_background: bool,
+    qr_mode: QRRenderMode,
+):
+    if shared_background:
+        pdf_canvas.doForm(BACKGROUND_FORM)
+    else:
+        pdf_canvas.drawImage(
+            template.reader, 0, 0, width=template.width, height=template.height
         )
-        qr.add_data(unique_id)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill="black", back_color="white")
 
-        qr_size = 515
-        qr_img = qr_img.resize((qr_size, qr_size), Image.LANCZOS)
+    qr = _build_qr(unique_id)
+    if qr_mode == QRRenderMode.RASTER:
+        _draw_qr_raster(pdf_canvas, qr)
+    else:
+        _draw_qr_vector(pdf_canvas, qr)
 
-        # Convert QR code to ImageReader
-        qr_io = io.BytesIO()
-        qr_img.save(qr_io, format="PNG")
-        qr_io.seek(0)
-        qr_reader = ImageReader(qr_io)
+    pdf_canvas.setFont("Helvetica-Bold", DATE_FONT_SIZE)
+    pdf_canvas.drawString(DATE_X, DATE_Y, _format_date(expiry_date))
 
-        # Position QR Code
-        qr_x = 22
-        qr_y = 43
-        pdf_canvas.drawImage(qr_reader, qr_x, qr_y, width=qr_size, height=qr_size)
+    pdf_canvas.showPage()
 
-        expiry_dt = datetime.fromisoformat(expiry_date)
-        formatted_date = expiry_dt.strftime("%B %d, %Y")
 
-        pdf_canvas.setFont("Helvetica-Bold", 20)
-        text_x = 960
-        text_y = 80
-        pdf_canvas.drawString(text_x, text_y, formatted_date)
+def _render_pdf(
+    vouchers: list[tuple[str, str]],
+    shared_background: bool = True,
+    qr_mode: QRRenderMode = QRRenderMode.VECTOR,
+) -> io.BytesIO:
+    try:
+        template = get_template()
 
-        pdf_canvas.showPage()
-        pdf_canvas.save()
+        pdf_canvas = canvas.Canvas(None, pagesize=(template.width, template.height))
 
-        pdf_io.seek(0)
-        return pdf_io
+        shared_background = shared_background and _supports_shared_background(
+            pdf_canvas
+        )
+        if shared_background:
+            _define_background_form(pdf_canvas, template)
+
+        for unique_id, expiry_date in vouchers:
+            _draw_voucher_page(
+                pdf_canvas,
+                template,
+                unique_id,
+                expiry_date,
+                shared_background,
+                qr_mode,
+            )
+
+        # getpdfdata returns the serialized document as is. save() would copy
+        # it into a file object, which getvalue() then copies once more. A
+        # BytesIO wrapping bytes shares them until it is written to.
+        return io.BytesIO(pdf_canvas.getpdfdata())
 
     except FileNotFoundError as fe:
-        raise HTTPException(status_code=404, detail=str(fe))
+        raise RenderError(404, str(fe))
 
     except IOError as ie:
-        raise HTTPException(
-            status_code=500, detail=f"Image processing error: {str(ie)}"
-        )
+        raise RenderError(500, f"Image processing error: {str(ie)}")
 
     except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"QR code PDF generation failed: {str(e)}"
-        )
+        raise RenderError(500, f"QR code PDF generation failed: {str(e)}")
+
+
+def generate_qr_code(
+    unique_id: str,
+    expiry_date: str,
+    shared_background: bool = True,
+    qr_mode: QRRenderMode = QRRenderMode.VECTOR,
+) -> io.BytesIO:
+    return _render_pdf([(unique_id, expiry_date)], shared_background, qr_mode)
+
+
+def generate_qr_code_batch(
+    vouchers: list[tuple[str, str]],
+    shared_background: bool = True,
+    qr_mode: QRRenderMode = QRRenderMode.VECTOR,
+) -> io.BytesIO:
+    """
+    Renders several vouchers into a single multi-page PDF.
+
+    Args:
+        vouchers (list[tuple[str, str]]): (voucher ID, expiry date) pairs, one per page.
+        shared_background (bool): Draw the template once as a form XObject
+            shared by every page, built from a per-process precompressed
+            image. When False the template is drawn onto each page directly.
+        qr_mode (QRRenderMode): Draw the QR modules as vector rectangles, or
+            embed a resampled raster image of the code.
+
+    Returns:
+        io.BytesIO: The multi-page PDF, rewound to the start.
+    """
+    return _render_pdf(vouchers, shared_background, qr_mode)
+
+
+def render_voucher_pdf_batch(vouchers: list[tuple[str, str]]) -> bytes:
+    """Picklable entry point for rendering a multi-page PDF on a process pool."""
+    return generate_qr_code_batch(vouchers).getvalue()
+
+
+_date_font = None
+_scratch = threading.local()
+
+
+def _get_date_font() -> ImageFont.FreeTypeFont:
+    global _date_font
+    if _date_font is None:
+        _date_font = ImageFont.truetype(DATE_FONT_FILE, DATE_FONT_SIZE)
+    return _date_font
+
+
+def _scratch_image(template: CachedTemplate) -> Image.Image:
+    """
+    Returns this thread's canvas for image output, reset to the template.
+
+    Each render thread keeps one full-size image and pastes the template over
+    it, instead of allocating a fresh copy of the template per render.
+    """
+    image = getattr(_scratch, "image", None)
+    if image is None or image.size != template.image.size:
+        image = _scratch.image = Image.new(template.image.mode, template.image.size)
+    image.paste(template.image)
+    return image
+
+
+class PDFRenderer:
+    """Renders a voucher as a one-page PDF through the ReportLab canvas."""
+
+    def __init__(self):
+        self.media_type = VOUCHER_MEDIA_TYPES[VoucherFormat.PDF]
+
+    def render(self, unique_id: str, expiry_date: str) -> bytes:
+        return generate_qr_code(unique_id, expiry_date).getvalue()
+
+
+class ImageRenderer:
+    """
+    Renders a voucher as a single image, for wallet passes and SMS.
+
+    The QR code and expiry date are composited straight onto a copy of the
+    cached template with PIL, so no PDF canvas is built. The image has the
+    template's resolution, one pixel per PDF point, and the same layout as
+    the PDF. QR modules are scaled with nearest-neighbour sampling, which
+    keeps their edges sharp.
+    """
+
+    def __init__(self, voucher_format: VoucherFormat, pil_format: str, **save_options):
+        self.media_type = VOUCHER_MEDIA_TYPES[voucher_format]
+        self._pil_format = pil_format
+        self._save_options = save_options
+
+    def render(self, unique_id: str, expiry_date: str) -> bytes:
+        try:
+            template = get_template()
+            image = _scratch_image(template)
+
+            matrix = _build_qr(unique_id).get_matrix()
+            qr_image = Image.new("L", (len(matrix), len(matrix)))
+            qr_image.putdata([0 if dark else 255 for row in matrix for dark in row])
+            # PDF coordinates start at the bottom left, PIL's at the top left.
+            image.paste(
+                qr_image.resize((QR_SIZE, QR_SIZE), Image.NEAREST),
+                (QR_X, template.height - QR_Y - QR_SIZE),
+            )
+
+            ImageDraw.Draw(image).text(
+                (DATE_X, template.height - DATE_Y),
+                _format_date(expiry_date),
+                fill="black",
+                font=_get_date_font(),
+                anchor="ls",
+            )
+
+            output = io.BytesIO()
+            image.save(output, format=self._pil_format, **self._save_options)
+            return output.getvalue()
+
+        except FileNotFoundError as fe:
+            raise RenderError(404, str(fe))
+
+        except IOError as ie:
+            raise RenderError(500, f"Image processing error: {str(ie)}")
+
+        except Exception as e:
+            raise RenderError(500, f"Voucher image generation failed: {str(e)}")
+
+
+RENDERERS = {
+    VoucherFormat.PDF: PDFRenderer(),
+    # Encoder settings favour latency, see benchmarks/formats.py. PNG is the
+    # lossless choice; where payload size matters, WebP or JPEG are smaller.
+    VoucherFormat.PNG: ImageRenderer(VoucherFormat.PNG, "PNG", compress_level=1),
+    VoucherFormat.JPEG: ImageRenderer(VoucherFormat.JPEG, "JPEG", quality=85),
+    VoucherFormat.WEBP: ImageRenderer(VoucherFormat.WEBP, "WEBP", quality=80, method=0),
+}
+
+
+def render_voucher(
+    unique_id: str, expiry_date: str, voucher_format: VoucherFormat = VoucherFormat.PDF
+) -> bytes:
+    """Picklable entry point for rendering a voucher in any format on a process pool."""
+    return RENDERERS[VoucherFormat(voucher_format)].render(unique_id, expiry_date)
+
+
+def render_voucher_tagged(
+    unique_id: str, expiry_date: str, voucher_format: VoucherFormat = VoucherFormat.PDF
+) -> tuple[bytes, Optional[str]]:
+    """
+    Picklable entry point like render_voucher that also returns the ETag of
+    the template the voucher was drawn on, for keying the render cache. The
+    ETag is None if the worker refreshed the template during the render.
+    """
+    try:
+        etag = get_template().etag
+    except Exception:
+        etag = None  # The render reports the template error.
+    output = render_voucher(unique_id, expiry_date, voucher_format)
+    return output, etag if get_template().etag == etag else None
@@ -1,21 +1,24 @@
 from fastapi import HTTPException
 import io
-import smtplib
-import os
+import mimetypes
+from email.policy import compat32
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
+from email.mime.image import MIMEImage
+from typing import Union
+from core.config import config
+from core.metrics import timed
+from infrastructure.smtp import smtp_pool
 
-from dotenv import load_dotenv
 
-load_dotenv()
-
-
-def send_email(
-    email: str, pdf_data: io.BytesIO, filename: str = "Atletika_Voucher.pdf"
-):
+def build_email(
+    email: str,
+    pdf_data: Union[io.BytesIO, bytes],
+    filename: str = "Atletika_Voucher.pdf",
+) -> MIMEMultipart:
     msg = MIMEMultipart()
-    msg["From"] = os.getenv("EMAIL_ADDRESS")
+    msg["From"] = config.EMAIL_ADDRESS
     msg["To"] = email
     msg["Subject"] = "🎉 Congratulations! You've Received an Atletika Voucher!"
 
@@ -34,16 +37,39 @@ def send_email(
 
     msg.attach(MIMEText(body, "html"))
 
-    pdf_data.seek(0)
-    attachment = MIMEApplication(pdf_data.read(), _subtype="pdf")
+    if isinstance(pdf_data, io.BytesIO):
+        pdf_data = pdf_data.getvalue()
+    content_type = mimetypes.guess_type(filename)[0] or "application/pdf"
+    maintype, subtype = content_type.split("/")
+    if maintype == "image":
+        attachment = MIMEImage(pdf_data, _subtype=subtype)
+    else:
+        attachment = MIMEApplication(pdf_data, _subtype=subtype)
     attachment.add_header("Content-Disposition", f'attachment; filename="{filename}"')
     msg.attach(attachment)
 
+    return msg
+
+
+def serialize_email(msg: MIMEMultipart) -> bytes:
+    """
+    Serializes a message for sendmail with CRLF line endings. smtplib sends
+    bytes as they are, and servers reject bare LF line endings.
+    """
+    return msg.as_bytes(policy=compat32.clone(linesep="\r\n"))
+
+
+def send_email(
+    email: str,
+    pdf_data: Union[io.BytesIO, bytes],
+    filename: str = "Atletika_Voucher.pdf",
+):
+    msg = build_email(email, pdf_data, filename)
+
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_APP_PASSWORD"))
-            server.sendmail(msg["From"], msg["To"], msg.as_string())
+        with smtp_pool.connection() as server:
+            with timed("smtp.send"):
+                server.sendmail(msg["From"], msg["To"], serialize_email(msg))
         print("Email sent successfully!")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Email sending failed: {str(e)}")
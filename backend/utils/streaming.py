@@ -0,0 +1,22 @@
+from typing import AsyncIterator
+
+# Responses are sent in chunks of this many bytes. It is also the chunk size
+# for S3 bodies, whose iter_chunks defaults to 1 KiB.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def iter_buffer(
+    data: bytes, chunk_size: int = STREAM_CHUNK_SIZE
+) -> AsyncIterator[memoryview]:
+    """
+    Streams an in-memory payload as slices of a memoryview, without copying.
+
+    Handing a BytesIO to StreamingResponse iterates it line by line, which
+    for binary data means arbitrary, often tiny chunks, each fetched through
+    the threadpool. Slicing the payload sends it in fixed-size chunks
+    straight from the event loop. Wrapping it in a BytesIO first would copy
+    it as soon as its buffer is exported.
+    """
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start : start + chunk_size]
@@ -0,0 +1,120 @@
+import io
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from core.config import config
+from infrastructure.s3 import retrieve_template_if_modified
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedTemplate:
+    name: str
+    etag: str
+    image: Image.Image
+    reader: ImageReader
+    width: int
+    height: int
+    validated_at: float
+
+
+_templates: dict[str, CachedTemplate] = {}
+_lock = threading.Lock()
+
+
+def _flatten(img_bytes: bytes) -> Image.Image:
+    base_image = Image.open(io.BytesIO(img_bytes))
+
+    # Ensure PNG is in RGB mode
+    if base_image.mode in ("RGBA", "LA"):
+        white_bg = Image.new("RGB", base_image.size, (255, 255, 255))
+        white_bg.paste(
+            base_image, mask=base_image.split()[-1]
+        )  # Apply alpha channel as mask
+        return white_bg
+
+    return base_image.convert("RGB")
+
+
+def _is_fresh(template: Optional[CachedTemplate], now: float) -> bool:
+    return (
+        template is not None and now - template.validated_at < config.TEMPLATE_CACHE_TTL
+    )
+
+
+def get_template(template_name: str = config.VOUCHER_TEMPLATE) -> CachedTemplate:
+    """
+    Returns a decoded, RGB-flattened template ready to be drawn by ReportLab.
+
+    Templates are cached per process. Once TEMPLATE_CACHE_TTL seconds have
+    passed the cached copy is revalidated with a conditional GET on its ETag,
+    so an unchanged template is never downloaded or decoded twice. If S3 is
+    unreachable during revalidation the stale copy keeps being served.
+
+    Args:
+        template_name (str): The name of the template file.
+
+    Returns:
+        CachedTemplate: The cached template.
+    """
+    now = time.monotonic()
+    cached = _templates.get(template_name)
+    if _is_fresh(cached, now):
+        return cached
+
+    with _lock:
+        cached = _templates.get(template_name)
+        if _is_fresh(cached, now):
+            return cached
+
+        try:
+            img_bytes, etag = retrieve_template_if_modified(
+                template_name, cached.etag if cached else None
+            )
+        except Exception:
+            if cached is None:
+                raise
+            logger.warning(
+                "Template '%s' revalidation failed, serving cached copy.",
+                template_name,
+                exc_info=True,
+            )
+            cached.validated_at = now
+            return cached
+
+        if img_bytes is None:
+            cached.validated_at = now
+            return cached
+
+        image = _flatten(img_bytes)
+        template = CachedTemplate(
+            name=template_name,
+            etag=etag,
+            image=image,
+            reader=ImageReader(image),
+            width=image.size[0],
+            height=image.size[1],
+            validated_at=now,
+        )
+        _templates[template_name] = template
+        return template
+
+
+def preload_templates(template_names: list[str] = config.PRELOAD_TEMPLATES):
+    for template_name in template_names:
+        try:
+            get_template(template_name)
+        except Exception:
+            logger.warning(
+                "Failed to preload template '%s'.", template_name, exc_info=True
+            )
+
+
+def clear_templates():
+    with _lock:
+        _templates.clear()